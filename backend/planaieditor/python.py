@@ -640,6 +640,8 @@ def create_llm_args(llm_config: Dict[str, Any]) -> List[str]:
         "remoteUsername": "username",
     }
 
+    # Work on a copy so that the caller's node data is left untouched
+    llm_config = dict(llm_config)
     for frontend_key, backend_key in key_map.items():
         if frontend_key in llm_config:
             llm_config[backend_key] = llm_config.pop(frontend_key)
@@ -20,7 +20,7 @@ class TempFileManager:
     Manages temporary files for in-memory URIs and translates URIs in LSP messages.
     """
 
-    def __init__(self):
+    def __init__(self, temp_dir: Optional[str] = None):
         self.inmemory_to_temp_path: Dict[str, str] = (
             {}
         )  # "inmemory://model/1" -> "/tmp/xyz.py"
@@ -31,7 +31,13 @@ class TempFileManager:
             {}
         )  # "inmemory://model/1" -> TextDocument(...)
         self.temp_file_lock = threading.Lock()
-        temp_file_log.info("TempFileManager instance initialized.")
+        # None lets tempfile fall back to the system default directory, which
+        # honors TMPDIR
+        self.temp_dir: Optional[str] = temp_dir
+        temp_file_log.info(
+            "TempFileManager instance initialized (temp dir: %s).",
+            self.temp_dir or tempfile.gettempdir(),
+        )
 
     def _sanitize_uri_for_filename(self, uri: str) -> str:
         return uri.replace("://", "_").replace("/", "_").replace(":", "_")
@@ -41,9 +47,20 @@ class TempFileManager:
             return self.inmemory_to_temp_path.get(original_uri)
 
     def _get_original_uri(self, temp_file_path: str) -> Optional[str]:
+        # Stored paths are resolved on creation, so the server usually hands
+        # back exactly that string and no filesystem call is needed
         with self.temp_file_lock:
+            original_uri = self.temp_path_to_inmemory_uri.get(temp_file_path)
+        if original_uri is None:
             normalized_path = str(Path(temp_file_path).resolve())
-            return self.temp_path_to_inmemory_uri.get(normalized_path)
+            with self.temp_file_lock:
+                original_uri = self.temp_path_to_inmemory_uri.get(normalized_path)
+        return original_uri
+
+    def canonical_file_uri(self, original_uri: str) -> Optional[str]:
+        """Returns the file:// URI the language server sees for an in-memory URI."""
+        temp_file_path = self._get_temp_file_path(original_uri)
+        return Path(temp_file_path).as_uri() if temp_file_path else None
 
     def create_or_update_temp_file(
         self, original_uri: str, content: str
@@ -68,10 +85,12 @@ class TempFileManager:
                 else:  # Create new
                     sanitized_part = self._sanitize_uri_for_filename(original_uri)
                     fd, temp_path_str = tempfile.mkstemp(
-                        suffix=".py", prefix=f"jls_proxy_{sanitized_part}_"
+                        suffix=".py",
+                        prefix=f"jls_proxy_{sanitized_part}_",
+                        dir=self.temp_dir,
                     )
-                    os.close(fd)
-                    with open(temp_path_str, "w", encoding="utf-8") as f:
+                    # Write through the descriptor mkstemp already opened
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
                         f.write(content)
 
                     temp_path_str = str(Path(temp_path_str).resolve())
@@ -104,20 +123,21 @@ class TempFileManager:
         """Internal helper to delete a temp file; assumes lock is already held."""
         temp_path_str = self.inmemory_to_temp_path.pop(original_uri, None)
         if temp_path_str:
-            self.temp_path_to_inmemory_uri.pop(
-                str(Path(temp_path_str).resolve()),
-                None,  # Ensure normalized path is used for pop
+            # Stored paths are resolved on creation, so no re-resolve is needed
+            self.temp_path_to_inmemory_uri.pop(temp_path_str, None)
+            self._remove_temp_file(temp_path_str, original_uri)
+
+    def _remove_temp_file(self, temp_path_str: str, original_uri: str) -> None:
+        try:
+            os.remove(temp_path_str)
+            temp_file_log.info(
+                f"Deleted temporary file {temp_path_str} for URI {original_uri}"
+            )
+        except OSError as e:
+            temp_file_log.error(
+                f"Error deleting temporary file {temp_path_str}: {e}",
+                exc_info=True,
             )
-            try:
-                os.remove(temp_path_str)
-                temp_file_log.info(
-                    f"Deleted temporary file {temp_path_str} for URI {original_uri}"
-                )
-            except OSError as e:
-                temp_file_log.error(
-                    f"Error deleting temporary file {temp_path_str}: {e}",
-                    exc_info=True,
-                )
 
     def delete_temp_file(self, original_uri: str) -> None:
         with self.temp_file_lock:
@@ -126,105 +146,72 @@ class TempFileManager:
     def cleanup_all_temp_files(self):
         with self.temp_file_lock:
             temp_file_log.info("Cleaning up all temporary files...")
-            uris_to_delete = list(self.inmemory_to_temp_path.keys())
-            for uri in uris_to_delete:
-                self._delete_temp_file_internal(uri)  # Call the internal method
+            # Remove the files in one pass, then drop the mappings wholesale
+            # instead of popping both dictionaries entry by entry
+            for uri, temp_path_str in self.inmemory_to_temp_path.items():
+                self._remove_temp_file(temp_path_str, uri)
                 self.inmemory_documents.pop(
                     uri, None
                 )  # Also remove from documents cache
-            if not self.inmemory_to_temp_path and not self.temp_path_to_inmemory_uri:
-                temp_file_log.info(
-                    "All temporary files and mappings cleaned up successfully."
-                )
-            else:
-                temp_file_log.warning(
-                    "Some temporary files or mappings might not have been cleaned up."
-                )
+            self.inmemory_to_temp_path.clear()
+            self.temp_path_to_inmemory_uri.clear()
+            temp_file_log.info("All temporary files and mappings cleaned up.")
 
-    def _translate_uri_recursive(self, data: Any, direction: str) -> Any:
-        if isinstance(data, dict):
-            new_dict = {}
-            for key, value in data.items():
-                if key == "uri" and isinstance(value, str):
-                    translated_uri = value
-                    if direction == "to_server" and value.startswith("inmemory://"):
-                        # Temp file creation/update is handled before this recursive call for main doc URIs.
-                        # This part ensures other embedded URIs are also attempted to be translated.
-                        temp_file_path = self._get_temp_file_path(value)
-                        if temp_file_path:
-                            translated_uri = Path(temp_file_path).as_uri()
-                            if value != translated_uri:
-                                temp_file_log.debug(
-                                    f"Translated URI (to_server) in recursive: {value} -> {translated_uri}"
-                                )
-                    elif direction == "to_client" and value.startswith("file://"):
-                        try:
-                            path_from_uri = str(
-                                Path(value.replace("file://", "")).resolve()
-                            )
-                            original_inmemory_uri = self._get_original_uri(
-                                path_from_uri
-                            )
-                            if original_inmemory_uri:
-                                translated_uri = original_inmemory_uri
-                                if value != translated_uri:
-                                    temp_file_log.debug(
-                                        f"Translated URI (to_client) in recursive: {value} -> {translated_uri}"
-                                    )
-                        except Exception as e:  # Path might be invalid, keep original
-                            temp_file_log.warning(
-                                f"Error processing file URI for client translation {value}: {e}"
-                            )
-                    new_dict[key] = translated_uri
-                    if (
-                        translated_uri == value
-                    ):  # If no translation happened, recurse on value if it's a structure
-                        new_dict[key] = self._translate_uri_recursive(value, direction)
-
-                # Handle common LSP structures containing URIs
-                elif (
-                    key == "textDocument" and isinstance(value, dict) and "uri" in value
-                ):
-                    new_dict[key] = self._translate_uri_recursive(value, direction)
-                elif key == "documentChanges" and isinstance(value, list):
-                    new_dict[key] = [
-                        self._translate_uri_recursive(item, direction) for item in value
-                    ]
-                elif (
-                    key in ["location", "targetUri", "originSelectionRange"]
-                    and isinstance(value, dict)
-                    and "uri" in value
-                ):
-                    new_dict[key] = self._translate_uri_recursive(value, direction)
-                elif key in ["locations"] and isinstance(
-                    value, list
-                ):  # Often a list of Location objects
-                    new_dict[key] = [
-                        self._translate_uri_recursive(item, direction) for item in value
-                    ]
-                # For `targetUri` in LocationLink, it's a direct string value, not a dict.
-                elif key == "targetUri" and isinstance(value, str):
-                    translated_uri = value
-                    if direction == "to_client" and value.startswith("file://"):
-                        try:
-                            path_from_uri = str(
-                                Path(value.replace("file://", "")).resolve()
-                            )
-                            original_inmemory_uri = self._get_original_uri(
-                                path_from_uri
-                            )
-                            if original_inmemory_uri:
-                                translated_uri = original_inmemory_uri
-                        except Exception:
-                            pass  # Keep original if error
-                    new_dict[key] = translated_uri
-                else:
-                    new_dict[key] = self._translate_uri_recursive(value, direction)
-            return new_dict
-        elif isinstance(data, list):
-            return [self._translate_uri_recursive(item, direction) for item in data]
+    def _uri_to_server(self, value: str) -> str:
+        if not value.startswith("inmemory://"):
+            return value
+        # Temp file creation/update is handled before the walk for main doc URIs.
+        # This part ensures other embedded URIs are also attempted to be translated.
+        translated_uri = self.canonical_file_uri(value)
+        if not translated_uri:
+            return value
+        temp_file_log.debug(f"Translated URI (to_server): {value} -> {translated_uri}")
+        return translated_uri
+
+    def _uri_to_client(self, value: str) -> str:
+        if not value.startswith("file://"):
+            return value
+        try:
+            path_from_uri = value.replace("file://", "")
+            original_inmemory_uri = self._get_original_uri(path_from_uri)
+        except Exception as e:  # Path might be invalid, keep original
+            temp_file_log.warning(
+                f"Error processing file URI for client translation {value}: {e}"
+            )
+            return value
+        if not original_inmemory_uri:
+            return value
+        temp_file_log.debug(
+            f"Translated URI (to_client): {value} -> {original_inmemory_uri}"
+        )
+        return original_inmemory_uri
+
+    def _translate_uris_in_place(self, data: Any, direction: str) -> Any:
+        """Rewrites URI strings anywhere in a (copied) LSP message.
+
+        "uri" values are translated in both directions; the LocationLink
+        "targetUri" string only needs translating back to the client.
+        """
+        if direction == "to_server":
+            translate, uri_keys = self._uri_to_server, ("uri",)
         else:
-            return data
+            translate, uri_keys = self._uri_to_client, ("uri", "targetUri")
+
+        # Walk with an explicit stack instead of recursing and rebuilding every
+        # container; the callers already hand us a private deep copy
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                for key, value in node.items():
+                    if isinstance(value, str):
+                        if key in uri_keys:
+                            node[key] = translate(value)
+                    elif isinstance(value, (dict, list)):
+                        stack.append(value)
+            elif isinstance(node, list):
+                stack.extend(item for item in node if isinstance(item, (dict, list)))
+        return data
 
     def translate_message_to_server(self, message: Dict[str, Any]) -> Dict[str, Any]:
         method = message.get("method")
@@ -262,9 +249,9 @@ class TempFileManager:
                     )
                     # processed_message["params"]["textDocument"]["uri"] will remain inmemory://
                 else:
-                    # The recursive translator will handle replacing the URI in the message structure
+                    # The URI walk will handle replacing the URI in the message structure
                     temp_file_log.info(
-                        f"didOpen: {uri} mapped to temp file; URI will be translated by recursive call."
+                        f"didOpen: {uri} mapped to temp file; URI will be translated by the URI walk."
                     )
 
         elif method == "textDocument/didChange" and params:
@@ -328,11 +315,8 @@ class TempFileManager:
             if uri and uri.startswith("inmemory://"):
                 self.inmemory_documents.pop(uri, None)  # Remove from in-memory cache
 
-                # Directly get the file path and convert it to a file URI
-                temp_file_path_str = self._get_temp_file_path(uri)
-                translated_uri_for_server = None
-                if temp_file_path_str:
-                    translated_uri_for_server = Path(temp_file_path_str).as_uri()
+                # Directly get the file URI of the temp file
+                translated_uri_for_server = self.canonical_file_uri(uri)
 
                 temp_file_log.info(
                     f"didClose: Handling URI {uri}. Translating to file URI for server, then deleting temp file: {translated_uri_for_server}"
@@ -352,8 +336,8 @@ class TempFileManager:
                     )
                     return processed_message
 
-        return self._translate_uri_recursive(processed_message, "to_server")
+        return self._translate_uris_in_place(processed_message, "to_server")
 
     def translate_message_to_client(self, message: Dict[str, Any]) -> Dict[str, Any]:
         processed_message = json.loads(json.dumps(message))  # Deep copy
-        return self._translate_uri_recursive(processed_message, "to_client")
+        return self._translate_uris_in_place(processed_message, "to_client")
@@ -1,5 +1,7 @@
+import io
 import os
 import re
+import tokenize
 from pathlib import Path
 from textwrap import dedent
 from typing import Any, Dict, List, Optional, Tuple
@@ -7,6 +9,12 @@ from typing import Any, Dict, List, Optional, Tuple
 CODE_SNIPPETS_DIR = os.path.join(os.path.dirname(__file__), "codesnippets")
 
 
+_TRACEBACK_START_RE = re.compile(r"^Traceback \(most recent call last\):.*$", re.M)
+_TRACEBACK_FRAME_RE = re.compile(r"File \"(.*)\", line (\d+), in (\w+)")
+_OPENING_BRACKETS = frozenset({tokenize.LPAR, tokenize.LSQB, tokenize.LBRACE})
+_CLOSING_BRACKETS = frozenset({tokenize.RPAR, tokenize.RSQB, tokenize.RBRACE})
+
+
 def is_valid_python_class_name(name: str) -> bool:
     """Check if a string is a valid Python class name."""
     if not name:
@@ -16,7 +24,7 @@ def is_valid_python_class_name(name: str) -> bool:
 
 def split_method_signature_body(method_source: str) -> Tuple[Optional[str], List[str]]:
     """
-    Splits Python method source code into its signature and body lines using ast.
+    Splits Python method source code into its signature and body lines.
 
     Args:
         method_source: The source code of the method.
@@ -35,44 +43,13 @@ def split_method_signature_body(method_source: str) -> Tuple[Optional[str], List
         if not re.search(r"^\s*def\s+", dedented_source):
             return None, method_source.splitlines()
 
-        # Using a simpler but reliable approach for splitting signature and body
-        # Look for the first occurrence of "):", ")->" or ") ->" which typically marks the end of a signature
+        # Tokenize only as far as the signature: the first ":" outside any
+        # brackets ends it, which also skips colons in annotations and strings
         lines = dedented_source.splitlines()
-        signature_lines = []
-        body_lines = []
-
-        # Track if we're in the signature part
-        in_signature = True
-        paren_level = 0
-
-        for i, line in enumerate(lines):
-            if in_signature:
-                # Count opening and closing parentheses
-                paren_level += line.count("(") - line.count(")")
-
-                # Add to signature if we're still in the signature part
-                signature_lines.append(line)
-
-                # Check if this line contains the end of the signature
-                if paren_level <= 0 and ":" in line:
-                    # This line contains the end of the signature
-                    in_signature = False
-
-                    # The rest of the lines are body
-                    body_lines = lines[i + 1 :] if i + 1 < len(lines) else []
-                    break
-            else:
-                # Already in body, just append
-                body_lines.append(line)
-
-        # If we never found the end of the signature, parsing failed
-        if in_signature:
-            raise ValueError(
-                "Could not find end of signature (closing parenthesis and colon)"
-            )
-
-        # Join the signature lines
-        signature = "\n".join(signature_lines)
+        end_row = _find_signature_end_row(dedented_source)
+
+        signature = "\n".join(lines[:end_row])
+        body_lines = lines[end_row:]
 
         # Handle empty body
         if not body_lines:
@@ -82,12 +59,27 @@ def split_method_signature_body(method_source: str) -> Tuple[Optional[str], List
 
         return signature, body_lines
 
-    except (SyntaxError, ValueError, IndexError) as e:
+    except (SyntaxError, ValueError, IndexError, tokenize.TokenError) as e:
         print(f"Info: Splitting failed: {e}")
         # Parsing failed, return None for signature, and original lines as body
         return None, method_source.splitlines()
 
 
+def _find_signature_end_row(source: str) -> int:
+    """Returns the 1-based line on which the signature of a def ends."""
+    depth = 0
+    for tok in tokenize.generate_tokens(io.StringIO(source).readline):
+        if tok.type != tokenize.OP:
+            continue
+        if tok.exact_type in _OPENING_BRACKETS:
+            depth += 1
+        elif tok.exact_type in _CLOSING_BRACKETS:
+            depth -= 1
+        elif tok.exact_type == tokenize.COLON and depth == 0:
+            return tok.end[0]
+    raise ValueError("Could not find end of signature (closing parenthesis and colon)")
+
+
 def parse_traceback(traceback_str: str) -> Optional[Dict[str, Any]]:
     """Parses a traceback string and returns a structured error message."""
     # Traceback (most recent call last):
@@ -97,31 +89,26 @@ def parse_traceback(traceback_str: str) -> Optional[Dict[str, Any]]:
     #   blubber
     # NameError: name 'blubber' is not defined
 
-    in_traceback = False
-    collected_lines = []
-    class_name = None
-    for line in traceback_str.split("\n"):
-        if not in_traceback:
-            if line.startswith("Traceback (most recent call last):"):
-                in_traceback = True
-            continue
-
-        class_worker_match = re.search(r"File \"(.*)\", line (\d+), in (\w+)", line)
-        if class_worker_match:
-            class_name = class_worker_match.group(3)
-            collected_lines = []
-            continue
-
-        if class_name:
-            collected_lines.append(line)
+    start = _TRACEBACK_START_RE.search(traceback_str)
+    if not start:
+        return None
 
-    if not class_name:
+    # The last frame naming a class or function is where the error is reported;
+    # everything after that frame's line is the error message
+    last_frame = None
+    for last_frame in _TRACEBACK_FRAME_RE.finditer(traceback_str, start.end()):
+        pass
+    if not last_frame:
         return None
 
+    class_name = last_frame.group(3)
+    line_end = traceback_str.find("\n", last_frame.end())
+    message = "" if line_end == -1 else traceback_str[line_end + 1 :]
+
     return {
         "success": False,
         "error": {
-            "message": "\n".join(collected_lines),
+            "message": message,
             "nodeName": class_name,
             "fullTraceback": None,
         },
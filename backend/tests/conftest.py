@@ -1,10 +1,19 @@
+import copy
+import json
 import logging
 import os
 import sys
+from pathlib import Path
+
+import pytest
 
 # Add the parent directory to sys.path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+DEEPSEARCH_FIXTURE_PATH = (
+    Path(__file__).parent / "data" / "transformed_data_deepsearch_fixture.json"
+)
+
 
 def pytest_addoption(parser):
     parser.addoption(
@@ -18,3 +27,15 @@ def pytest_addoption(parser):
 def pytest_configure(config):
     """Configures logging to stdout/stderr."""
     logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+
+
+@pytest.fixture(scope="session")
+def deepsearch_fixture_raw():
+    """Loads the transformed deepsearch graph once per session. Treat as read-only."""
+    return json.loads(DEEPSEARCH_FIXTURE_PATH.read_text(encoding="utf-8"))
+
+
+@pytest.fixture
+def deepsearch_fixture(deepsearch_fixture_raw):
+    """Provides a private copy of the deepsearch graph that tests may mutate."""
+    return copy.deepcopy(deepsearch_fixture_raw)
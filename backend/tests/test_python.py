@@ -1,6 +1,6 @@
 import ast  # Added for ast.parse in the new test
-import json
-import os
+import re
+from typing import NoReturn
 
 from planaieditor.python import (
     create_all_graph_dependencies,
@@ -10,6 +10,56 @@ from planaieditor.python import (
     worker_to_instance_name,
 )
 
+_TASK_TYPES = frozenset({"task", "taskimport"})
+_WORKER_TYPES = frozenset(
+    {
+        "taskworker",
+        "llmtaskworker",
+        "cachedtaskworker",
+        "cachedllmtaskworker",
+        "joinedtaskworker",
+        "chattaskworker",
+        "subgraphworker",
+    }
+)
+_EDGE_SETUP_LINE = re.compile(r"^.*(?:set_dependency|set_entry).*$", re.MULTILINE)
+
+
+# Source of the calculator tool used by test_llm_task_worker_with_tool_generation
+_TOOL_FN_SRC = '''
+def custom_calculator_tool(operation: str, val1: float, val2: float) -> float:
+    """Performs a calculation based on the operation.
+    
+    Args:
+        operation: The operation to perform ('add', 'subtract').
+        val1: The first value.
+        val2: The second value.
+
+    Returns:
+        The result of the calculation.
+    """
+    if operation == "add":
+        return val1 + val2
+    elif operation == "subtract":
+        return val1 - val2
+    else:
+        raise ValueError("Unsupported operation")
+'''
+# Whitespace-normalized, non-empty lines of _TOOL_FN_SRC for comparison
+_TOOL_FN_LINES = tuple(
+    line.strip() for line in _TOOL_FN_SRC.split("\n") if line.strip()
+)
+
+
+def _fail(message: str, code: str) -> NoReturn:
+    """Raises an AssertionError that includes the offending generated code."""
+    raise AssertionError(f"{message}\n--- Generated Code ---:\n{code}")
+
+
+def _line_set(code: str) -> set:
+    """Returns the set of stripped lines in code for whole-line membership checks."""
+    return {line.strip() for line in code.splitlines()}
+
 
 def test_worker_class_method_handling():
     """Test how create_worker_class handles different method definitions."""
@@ -110,43 +160,33 @@ def test_worker_class_with_real_examples():
     assert "pass" in worker_class_code
 
 
-def test_fixture_worker_to_instance_name():
+def test_fixture_worker_to_instance_name(deepsearch_fixture_raw):
     """Test that worker_to_instance_name correctly handles all node types from our fixture."""
-    # Load the fixture data
-    fixture_path = os.path.join(
-        os.path.dirname(__file__), "data", "transformed_data_deepsearch_fixture.json"
-    )
-    with open(fixture_path, "r") as f:
-        fixture_data = json.load(f)
-
-    # Test a few specific nodes to ensure they get correct instance names
-    nodes = fixture_data["nodes"]
+    # Index the nodes by className for direct lookups
+    nodes_by_classname = {
+        n["data"].get("className"): n
+        for n in deepsearch_fixture_raw["nodes"]
+        if n.get("data")
+    }
 
     # Find the UserChat node - type chattaskworker
-    user_chat_node = next(n for n in nodes if n["data"]["className"] == "UserChat")
+    user_chat_node = nodes_by_classname["UserChat"]
     instance_name = worker_to_instance_name(user_chat_node)
     assert (
         instance_name == "chat_worker"
     ), f"Expected 'chat_worker', got '{instance_name}'"
 
     # Find the ChatAdapter node - type taskworker
-    chat_adapter_node = next(
-        n for n in nodes if n["data"]["className"] == "ChatAdapter"
-    )
+    chat_adapter_node = nodes_by_classname["ChatAdapter"]
     instance_name = worker_to_instance_name(chat_adapter_node)
     assert (
         instance_name == "chat_adapter"
     ), f"Expected 'chat_adapter', got '{instance_name}'"
 
 
-def test_fixture_edge_generation():
+def test_fixture_edge_generation(deepsearch_fixture):
     """Test edge generation using the fixture to debug the missing instances issue."""
-    # Load the fixture data
-    fixture_path = os.path.join(
-        os.path.dirname(__file__), "data", "transformed_data_deepsearch_fixture.json"
-    )
-    with open(fixture_path, "r") as f:
-        fixture_data = json.load(f)
+    fixture_data = deepsearch_fixture
 
     # Extract just the nodes relevant to our failing edges for a simplified test
     all_nodes = fixture_data["nodes"]
@@ -200,36 +240,26 @@ def test_fixture_edge_generation():
     print(python_code)
 
 
-def test_fixture_edge_generation_full():
+def test_fixture_edge_generation_full(deepsearch_fixture, request):
     """Test edge generation with the full fixture to get detailed debugging information."""
-    # Load the fixture data
-    fixture_path = os.path.join(
-        os.path.dirname(__file__), "data", "transformed_data_deepsearch_fixture.json"
-    )
-    with open(fixture_path, "r") as f:
-        fixture_data = json.load(f)
+    # Only build the debugging report when pytest runs with -v
+    verbose = request.config.getoption("verbose") > 0
+    fixture_data = deepsearch_fixture
+    nodes_by_classname = {
+        n["data"].get("className"): n for n in fixture_data["nodes"] if n.get("data")
+    }
 
     # Create a dictionary to collect debugging info
     debug_info = {"worker_instances": {}, "task_names": set(), "edge_processing": []}
 
-    # Map class names to instance names for all worker nodes
+    # Map class names to instance names for all worker nodes and collect task names
     for node in fixture_data["nodes"]:
-        if node.get("type") in [
-            "taskworker",
-            "llmtaskworker",
-            "cachedtaskworker",
-            "cachedllmtaskworker",
-            "joinedtaskworker",
-            "chattaskworker",
-            "subgraphworker",
-        ]:
+        node_type = node.get("type")
+        if node_type in _WORKER_TYPES:
             class_name = node.get("data", {}).get("className")
             instance_name = worker_to_instance_name(node)
             debug_info["worker_instances"][class_name] = instance_name
-
-    # Collect task names
-    for node in fixture_data["nodes"]:
-        if node.get("type") == "task" or node.get("type") == "taskimport":
+        elif node_type in _TASK_TYPES:
             class_name = node.get("data", {}).get("className")
             if class_name:
                 debug_info["task_names"].add(class_name)
@@ -257,38 +287,34 @@ def test_fixture_edge_generation_full():
     python_code, module_name, error = generate_python_module(fixture_data)
 
     # Print debugging information
-    print("\nDebugging information:")
-    print(f"Worker instances: {debug_info['worker_instances']}")
-    print(f"Task names: {debug_info['task_names']}")
+    if verbose:
+        print("\nDebugging information:")
+        print(f"Worker instances: {debug_info['worker_instances']}")
+        print(f"Task names: {debug_info['task_names']}")
 
-    print("\nEdge processing:")
+        print("\nEdge processing:")
     problematic_edges = []
     for edge_info in debug_info["edge_processing"]:
-        print(f"Edge: {edge_info['source_class']} -> {edge_info['target_class']}")
-        print(f"  Source instance: {edge_info['source_instance']}")
-        print(f"  Target instance: {edge_info['target_instance']}")
-        print(f"  Is task->worker: {edge_info['is_task_to_worker']}")
-        print(f"  Is valid edge: {edge_info['is_valid']}")
+        if verbose:
+            print(f"Edge: {edge_info['source_class']} -> {edge_info['target_class']}")
+            print(f"  Source instance: {edge_info['source_instance']}")
+            print(f"  Target instance: {edge_info['target_instance']}")
+            print(f"  Is task->worker: {edge_info['is_task_to_worker']}")
+            print(f"  Is valid edge: {edge_info['is_valid']}")
 
         # Keep track of problematic edges
         if not edge_info["is_valid"] and not edge_info["is_task_to_worker"]:
             problematic_edges.append(edge_info)
 
     # Inspect problematic edges more closely
-    if problematic_edges:
+    if problematic_edges and verbose:
         print("\nProblematic edges found:")
         for edge in problematic_edges:
             print(f"  {edge['source_class']} -> {edge['target_class']}")
 
             # Check if source and target exist in the nodes list
-            source_exists = any(
-                n.get("data", {}).get("className") == edge["source_class"]
-                for n in fixture_data["nodes"]
-            )
-            target_exists = any(
-                n.get("data", {}).get("className") == edge["target_class"]
-                for n in fixture_data["nodes"]
-            )
+            source_exists = edge["source_class"] in nodes_by_classname
+            target_exists = edge["target_class"] in nodes_by_classname
 
             print(f"  Source class exists in nodes: {source_exists}")
             print(f"  Target class exists in nodes: {target_exists}")
@@ -299,34 +325,30 @@ def test_fixture_edge_generation_full():
     )
     user_chat_entry_point = "graph.set_entry(chat_worker)" in python_code
 
-    print("\nAnalyzing generated code for UserChat -> ChatAdapter edge:")
-    print("✓ Edge found" if user_chat_to_chat_adapter else "✗ Edge missing")
+    if verbose:
+        print("\nAnalyzing generated code for UserChat -> ChatAdapter edge:")
+        print("✓ Edge found" if user_chat_to_chat_adapter else "✗ Edge missing")
 
-    print("\nAnalyzing generated code for UserChat entry point:")
-    print("✓ Entry point found" if user_chat_entry_point else "✗ Entry point missing")
+        print("\nAnalyzing generated code for UserChat entry point:")
+        print(
+            "✓ Entry point found" if user_chat_entry_point else "✗ Entry point missing"
+        )
 
     # Output a relevant portion of the generated code for debugging
-    if python_code:
+    if python_code and verbose:
         # Look for the part of the code that sets up edges
         print("\nCode excerpt for edge setup:")
-        lines = python_code.split("\n")
-        for i, line in enumerate(lines):
-            if "set_dependency" in line or "set_entry" in line:
-                start = max(0, i - 2)
-                end = min(len(lines), i + 3)
-                print("\n".join(lines[start:end]))
+        for match in _EDGE_SETUP_LINE.finditer(python_code):
+            print(python_code[max(0, match.start() - 80) : match.end() + 80])
 
     # Check the issue with worker_to_instance_name
-    for node in fixture_data["nodes"]:
-        if node.get("data", {}).get("className") in ["UserChat", "ChatAdapter"]:
-            node_class = node.get("data", {}).get("className")
-            node_type = node.get("type")
-            var_name = node.get("data", {}).get("variableName")
-            instance = worker_to_instance_name(node)
+    if verbose:
+        for node_class in ("UserChat", "ChatAdapter"):
+            node = nodes_by_classname[node_class]
             print(f"\nDetail for {node_class}:")
-            print(f"  Type: {node_type}")
-            print(f"  variableName: {var_name}")
-            print(f"  Calculated instance name: {instance}")
+            print(f"  Type: {node.get('type')}")
+            print(f"  variableName: {node.get('data', {}).get('variableName')}")
+            print(f"  Calculated instance name: {worker_to_instance_name(node)}")
 
     # Forcefully fail the test to see output
     if not user_chat_to_chat_adapter or not user_chat_entry_point:
@@ -398,10 +420,15 @@ def test_create_all_graph_dependencies_simple():
     nodes = graph_data["nodes"]
     edges = graph_data["edges"]
 
-    task_nodes = [n for n in nodes if n["type"] == "task"]
-    task_import_nodes = [n for n in nodes if n["type"] == "taskimport"]
-    worker_nodes = [n for n in nodes if n["type"] == "taskworker"]
-    output_nodes = [n for n in nodes if n["type"] == "dataoutput"]
+    # Bucket the nodes by type in a single pass
+    nodes_by_type = {"task": [], "taskimport": [], "taskworker": [], "dataoutput": []}
+    for n in nodes:
+        nodes_by_type.setdefault(n["type"], []).append(n)
+
+    task_nodes = nodes_by_type["task"]
+    task_import_nodes = nodes_by_type["taskimport"]
+    worker_nodes = nodes_by_type["taskworker"]
+    output_nodes = nodes_by_type["dataoutput"]
 
     dependency_code = create_all_graph_dependencies(
         task_nodes, task_import_nodes, worker_nodes, output_nodes, edges
@@ -429,20 +456,11 @@ def test_create_all_graph_dependencies_simple():
     ), f"Expected metadata definition containing '{expected_metadata_def}' not found in:\n{dependency_code}"
 
 
-def test_roundtrip_fixture_conversion():
+def test_roundtrip_fixture_conversion(deepsearch_fixture):
     """Test that we can convert JSON fixture -> Python -> JSON and get the same workers and edges."""
-    import json
-    import tempfile
-    from pathlib import Path
-
     from planaieditor.patch import get_definitions_from_python
 
-    # Load the fixture data
-    fixture_path = os.path.join(
-        os.path.dirname(__file__), "data", "transformed_data_deepsearch_fixture.json"
-    )
-    with open(fixture_path, "r") as f:
-        fixture_data = json.load(f)
+    fixture_data = deepsearch_fixture
 
     # Step 1: Convert JSON to Python code
     python_code, module_name, error = generate_python_module(fixture_data)
@@ -451,71 +469,59 @@ def test_roundtrip_fixture_conversion():
     assert error is None, f"Error generating Python code: {error}"
     assert python_code is not None, "No Python code was generated"
 
-    # Step 2: Write Python code to a temporary file
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".py", delete=False) as temp_file:
-        temp_file.write(python_code)
-        temp_file_path = temp_file.name
-
     try:
-        # Step 3: Parse Python code back to JSON
-        parsed_data = get_definitions_from_python(temp_file_path)
-
-        # Step 4: Compare the original and parsed data
+        ast.parse(python_code)
+    except SyntaxError as e:
+        _fail(f"The generated module code has syntax errors: {e}", python_code)
 
-        # Create maps of workers by className for easier comparison
-        original_workers = {}
-        # Map to store node type by class name
-        node_type_by_class = {}
+    # Step 2: Parse Python code back to JSON directly from the generated source
+    parsed_data = get_definitions_from_python(code_string=python_code)
 
-        for node in fixture_data["nodes"]:
-            if node["type"] not in ["task", "taskimport"]:
-                class_name = node["data"]["className"]
-                original_workers[class_name] = node["data"]
-                node_type_by_class[class_name] = node["type"]
+    # Step 3: Compare the original and parsed data
 
-        parsed_workers = {
-            worker["className"]: worker for worker in parsed_data["workers"]
-        }
+    # Create maps of workers by className for easier comparison
+    original_workers = {}
+    # Map to store node type by class name
+    node_type_by_class = {}
 
-        # Check that all original workers are in the parsed data
-        for class_name, original_worker in original_workers.items():
-            assert (
-                class_name in parsed_workers
-            ), f"Worker {class_name} missing from parsed data"
-
-            # Get the expected worker type from the node type
-            original_type = node_type_by_class.get(class_name, "").lower()
-            expected_worker_type = original_type
+    for node in fixture_data["nodes"]:
+        if node["type"] not in _TASK_TYPES:
+            class_name = node["data"]["className"]
+            original_workers[class_name] = node["data"]
+            node_type_by_class[class_name] = node["type"]
 
-            parsed_type = parsed_workers[class_name]["workerType"].lower()
-            assert (
-                parsed_type == expected_worker_type
-            ), f"Worker {class_name} type mismatch: {parsed_type} != {expected_worker_type}"
+    parsed_workers = {worker["className"]: worker for worker in parsed_data["workers"]}
 
-        # Normalize edges for comparison
-        original_edges_worker = set()
-        for edge in fixture_data["edges"]:
-            original_edges_worker.add((edge["source"], edge["target"]))
+    # Check that all original workers are in the parsed data
+    for class_name, original_worker in original_workers.items():
+        assert (
+            class_name in parsed_workers
+        ), f"Worker {class_name} missing from parsed data"
 
-        parsed_edges_worker = set()
-        for edge in parsed_data["edges"]:
-            parsed_edges_worker.add((edge["source"], edge["target"]))
+        # Get the expected worker type from the node type
+        original_type = node_type_by_class.get(class_name, "").lower()
+        expected_worker_type = original_type
 
-        # Check worker-to-worker edges
+        parsed_type = parsed_workers[class_name]["workerType"].lower()
         assert (
-            parsed_edges_worker == original_edges_worker
-        ), f"Worker-to-worker edge mismatch.\nExpected: {original_edges_worker}\nGot: {parsed_edges_worker}"
+            parsed_type == expected_worker_type
+        ), f"Worker {class_name} type mismatch: {parsed_type} != {expected_worker_type}"
 
-        # Print a summary
-        print("\nRound-trip conversion report:")
-        print(f"Original workers: {len(original_workers)}")
-        print(f"Parsed workers: {len(parsed_workers)}")
-        print(f"Original worker edges: {len(original_edges_worker)}")
-        print(f"Parsed worker edges: {len(parsed_edges_worker)}")
+    # Normalize edges for comparison
+    original_edges_worker = {(e["source"], e["target"]) for e in fixture_data["edges"]}
+    parsed_edges_worker = {(e["source"], e["target"]) for e in parsed_data["edges"]}
 
-    finally:
-        # Clean up the temporary file
-        Path(temp_file_path).unlink()
+    # Check worker-to-worker edges
+    assert (
+        parsed_edges_worker == original_edges_worker
+    ), f"Worker-to-worker edge mismatch.\nExpected: {original_edges_worker}\nGot: {parsed_edges_worker}"
+
+    # Print a summary
+    print("\nRound-trip conversion report:")
+    print(f"Original workers: {len(original_workers)}")
+    print(f"Parsed workers: {len(parsed_workers)}")
+    print(f"Original worker edges: {len(original_edges_worker)}")
+    print(f"Parsed worker edges: {len(parsed_edges_worker)}")
 
 
 def test_input_types():
@@ -752,35 +758,16 @@ def {tool_name}(param_x: str, param_y: int = 123) -> str:
 
     # Optionally, verify the generated code is syntactically valid Python
     try:
-        ast.parse(generated_module_code)
+        compile(generated_module_code, "<generated>", "exec", dont_inherit=True)
     except SyntaxError as e:
-        assert (
-            False
-        ), f"The generated module code has syntax errors: {e}\n--- Generated Code ---:\n{generated_module_code}"
+        _fail(
+            f"The generated module code has syntax errors: {e}", generated_module_code
+        )
 
 
 def test_llm_task_worker_with_tool_generation():
     """Tests that LLMTaskWorkers correctly include tool definitions and references."""
     tool_name = "custom_calculator_tool"
-    tool_function_code = '''
-def custom_calculator_tool(operation: str, val1: float, val2: float) -> float:
-    """Performs a calculation based on the operation.
-    
-    Args:
-        operation: The operation to perform ('add', 'subtract').
-        val1: The first value.
-        val2: The second value.
-
-    Returns:
-        The result of the calculation.
-    """
-    if operation == "add":
-        return val1 + val2
-    elif operation == "subtract":
-        return val1 - val2
-    else:
-        raise ValueError("Unsupported operation")
-'''
 
     graph_data = {
         "tools": [
@@ -789,7 +776,7 @@ def custom_calculator_tool(operation: str, val1: float, val2: float) -> float:
                 "type": "tool",
                 "name": tool_name,
                 "description": "A custom calculator tool.",
-                "code": tool_function_code,
+                "code": _TOOL_FN_SRC,
             },
         ],
         "nodes": [
@@ -839,39 +826,61 @@ def custom_calculator_tool(operation: str, val1: float, val2: float) -> float:
         generated_module_code is not None
     ), "generate_python_module did not produce any code."
 
+    # Parse once: this doubles as the syntax check and drives the structural checks
+    try:
+        tree = ast.parse(generated_module_code)
+    except SyntaxError as e:
+        _fail(
+            f"The generated module code has syntax errors: {e}", generated_module_code
+        )
+    top_level = {
+        node.name: node
+        for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef))
+    }
+
     # 1. Check for the @tool decorator and the tool function definition
-    expected_tool_decorator = (
-        f'@tool(name="{tool_name}", description="A custom calculator tool.")'
-    )
-    assert (
-        expected_tool_decorator in generated_module_code
-    ), f"Tool decorator missing or incorrect. Expected: {expected_tool_decorator}"
+    tool_function = top_level.get(tool_name)
+    assert isinstance(
+        tool_function, ast.FunctionDef
+    ), f"Tool function '{tool_name}' missing from generated module."
+    decorator_kwargs = {
+        kw.arg: ast.literal_eval(kw.value)
+        for decorator in tool_function.decorator_list
+        if isinstance(decorator, ast.Call) and ast.unparse(decorator.func) == "tool"
+        for kw in decorator.keywords
+    }
+    assert decorator_kwargs == {
+        "name": tool_name,
+        "description": "A custom calculator tool.",
+    }, f"Tool decorator missing or incorrect. Got: {decorator_kwargs}"
 
     # Check for the presence of the core tool function signature and body elements
-    # Normalizing whitespace in the provided tool_function_code for comparison
-    normalized_tool_function_code_lines = [
-        line.strip() for line in tool_function_code.split("\n") if line.strip()
-    ]
-    for line in normalized_tool_function_code_lines:
-        assert line in generated_module_code, f"Tool function line missing: '{line}'"
+    generated_lines = _line_set(generated_module_code)
+    missing_lines = [line for line in _TOOL_FN_LINES if line not in generated_lines]
+    assert not missing_lines, f"Tool function lines missing: {missing_lines}"
 
     # 2. Check for the LLMTaskWorker class and its 'tools' attribute
-    assert (
-        "class MathSolverLLM(LLMTaskWorker):" in generated_module_code
-    ), "LLMTaskWorker class definition missing."
+    worker_class = top_level.get("MathSolverLLM")
+    assert isinstance(worker_class, ast.ClassDef) and [
+        ast.unparse(base) for base in worker_class.bases
+    ] == ["LLMTaskWorker"], "LLMTaskWorker class definition missing."
     # Backend generation creates List[Tool] with the tool *name* which refers to the function
-    expected_tools_attribute = f"tools: List[Tool] = [{tool_name}]"
+    tools_attribute = next(
+        (
+            stmt
+            for stmt in worker_class.body
+            if isinstance(stmt, ast.AnnAssign)
+            and isinstance(stmt.target, ast.Name)
+            and stmt.target.id == "tools"
+        ),
+        None,
+    )
     assert (
-        expected_tools_attribute in generated_module_code
-    ), f"LLMTaskWorker 'tools' attribute missing or incorrect. Expected: {expected_tools_attribute}"
-
-    # 3. Verify the generated code is syntactically valid Python
-    try:
-        ast.parse(generated_module_code)
-    except SyntaxError as e:
-        assert (
-            False
-        ), f"The generated module code has syntax errors: {e}\\n--- Generated Code ---:\\n{generated_module_code}"
+        tools_attribute is not None
+        and ast.unparse(tools_attribute.annotation) == "List[Tool]"
+        and ast.unparse(tools_attribute.value) == f"[{tool_name}]"
+    ), "LLMTaskWorker 'tools' attribute missing or incorrect."
 
 
 def test_create_llm_args():
@@ -1024,3 +1033,16 @@ def test_create_llm_args():
         assert (
             "structured_outputs" not in arg
         ), f"structured_outputs should have been skipped but found in: {arg}"
+
+
+def test_create_llm_args_leaves_config_untouched():
+    """create_llm_args renames keys on a copy, not in the caller's llmConfig."""
+    llm_config = {
+        "provider": {"value": "openai", "is_literal": True},
+        "modelId": {"value": "gpt-4o", "is_literal": True},
+    }
+    snapshot = {key: dict(value) for key, value in llm_config.items()}
+
+    create_llm_args(llm_config)
+
+    assert llm_config == snapshot
@@ -1,44 +1,352 @@
-import os
-import tempfile
+import copy
+import logging
+import re
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, NamedTuple, Tuple
 
 import pytest
-from planaieditor.patch import get_definitions_from_python  # noqa: E402
-from planaieditor.python import generate_python_module  # noqa: E402
+from planaieditor.patch import get_definitions_from_python
+from planaieditor.python import generate_python_module
+
+
+logger = logging.getLogger(__name__)
+
+# Prompts are reformatted by the generator, so their values are not compared
+_PROMPT_VARS = frozenset({"prompt", "system_prompt"})
+
+# Tasks the subgraph factory sample imports from planai.patterns
+_PATTERN_TASKS = frozenset(
+    {"PlanRequest", "FinalPlan", "SearchQuery", "ConsolidatedPages"}
+)
+_PATTERN_TASK_RE = re.compile(r"\b(" + "|".join(sorted(_PATTERN_TASKS)) + r")\b")
+
+# Snippets the LLM config sample must regenerate, matched in a single scan
+_LLM_SNIPPETS = frozenset(
+    {
+        "llm_from_config(",
+        'provider="openai"',
+        'provider="anthropic"',
+        'model_name="gpt-4"',
+        'model_name="claude-3-opus-20240229"',
+        "max_tokens=1024",
+        "max_tokens=2048",
+    }
+)
+_LLM_SNIPPET_RE = re.compile("|".join(map(re.escape, sorted(_LLM_SNIPPETS))))
+
+# Deletes all whitespace in one pass for layout-insensitive code checks
+_STRIP_WHITESPACE = str.maketrans("", "", " \t\n\r\f\v")
+
+# Factory calls the subgraph sample must regenerate, whitespace already stripped
+_EXPECTED_PLANNER_CALL = "create_planning_worker(llm=get_llm(),num_variations=2)"
+_EXPECTED_SEARCHER_CALL = (
+    'create_search_fetch_worker(llm=get_llm(),name="CustomSearchFetcher")'
+)
+
+# Constant sample sources
+_SAMPLE_TASK_SRC = """
+from pydantic import Field
+from typing import List, Optional, Literal
+from planai import Task
+
+class SimpleTask(Task):
+    name: str = Field(description="Name of the task")
+    value: int = Field(description="Task value")
+
+class ComplexTask(Task):
+    text: str = Field(description="Text content")
+    tags: List[str] = Field([], description="List of tags")
+    priority: Optional[int] = Field(None, description="Task priority")
+    status: Literal["pending", "in_progress", "completed"] = Field(..., description="Current status")
+    subtasks: List[SimpleTask] = Field([], description="List of subtasks")
+"""
+
+_WORKER_SRC = """
+from pydantic import Field
+from typing import List, Optional, Literal, Type
+from planai import Task, TaskWorker, LLMTaskWorker, JoinedTaskWorker, CachedLLMTaskWorker
+from textwrap import dedent
+
+# --- Task Definitions ---
+class InputTask(Task):
+    data: str
+
+class OutputTask(Task):
+    result: str
+
+class AnalysisTask(Task):
+    analysis: dict
+
+class FinalReport(Task):
+    report: str
+
+class JoinedInput(Task):
+    value: int
+
+class CollectionTask(Task):
+    items: List[str]
+
+# --- Worker Definitions ---
+
+class BasicWorker(TaskWorker):
+    output_types: List[Type[Task]] = [OutputTask]
+    CUSTOM_VAR = "hello"
+
+    def consume_work(self, task: InputTask):
+        # Basic processing
+        processed = task.data.upper()
+        self.publish_work(OutputTask(result=processed), input_task=task)
+
+    def _helper_method(self):
+        return self.CUSTOM_VAR
+
+class AdvancedLLMWorker(CachedLLMTaskWorker):
+    llm_input_type = InputTask
+    llm_output_type = AnalysisTask
+    output_types = [AnalysisTask] # Explicitly define if different from llm_output_type
+    debug_mode = True
+    prompt: str = dedent(\"""
+        Analyze the input data: {task.data}
+        Provide the analysis.
+        \""").strip()
+    system_prompt: str = "You are an analyst."
+
+    # Optional methods
+    def extra_cache_key(self, task: InputTask) -> str:
+        return task.data[:10] # Cache based on first 10 chars
+
+    def post_process(self, respponse: AnalysisTask, input_task: InputTask):
+        # Modify the analysis after LLM
+        task.analysis['timestamp'] = "now"
+        return task
+
+class DataCollectorWorker(JoinedTaskWorker):
+    join_type: Type[TaskWorker] = BasicWorker # Join on BasicWorker outputs
+    output_types: List[Type[Task]] = [CollectionTask]
+
+    def consume_work_joined(self, tasks: List[OutputTask]):
+        # Collect results from BasicWorker
+        collected_items = [t.result for t in tasks]
+        self.publish_work(CollectionTask(items=collected_items), input_task=tasks[0])
+
+"""
+
+_IMPORTED_SRC = """
+from planai import Task, TaskWorker, Graph
+from planai.patterns import SearchQuery, SearchResult # Allowed import
+from typing import List, Type
+
+# Local Task
+class ProcessedResult(Task):
+    processed_data: str
+
+# Worker using imported Task
+class SearchProcessor(TaskWorker):
+    output_types: List[Type[Task]] = [ProcessedResult]
+
+    def consume_work(self, task: SearchQuery):
+        # Dummy processing
+        print(f"Processing search query: {task.query_text}")
+        self.publish_work(ProcessedResult(processed_data=task.query_text.upper()))
+
+# Another worker using local task
+class ResultAggregator(TaskWorker):
+    def consume_work(self, task: ProcessedResult):
+        print(f"Aggregating: {task.processed_data}")
+
+# Graph setup function (simplified for test)
+def setup_graph():
+    graph = Graph(name="ImportTestGraph")
+    search_proc = SearchProcessor()
+    aggregator = ResultAggregator()
+
+    graph.add_workers(search_proc, aggregator)
+    graph.set_dependency(search_proc, aggregator)
+    graph.set_entry(search_proc)
+    return graph
+
+"""
+
+_SUBGRAPH_SRC = """
+from pydantic import Field
+from typing import List, Type
+from planai import Task, TaskWorker, Graph, LLMTaskWorker
+from planai.patterns import PlanRequest, FinalPlan, SearchQuery, ConsolidatedPages
+from planai.patterns import create_planning_worker, create_search_fetch_worker
+
+# --- Task Definitions ---
+class InitialRequest(Task):
+    query: str
+
+class ProcessedResult(Task):
+    processed_data: str
+
+class FinalOutput(Task):
+    summary: str
+
+# --- Worker Definitions ---
+class InputProcessor(TaskWorker):
+    output_types: List[Type[Task]] = [PlanRequest]
+
+    def consume_work(self, task: InitialRequest):
+        # Convert to PlanRequest
+        plan_req = PlanRequest(query_text=task.query)
+        self.publish_work(plan_req, input_task=task)
+
+class OutputProcessor(LLMTaskWorker):
+    llm_input_type = FinalPlan
+    output_types = [FinalOutput]
+    prompt: str = "Summarize the final plan: {task.plan_text}"
+
+    def consume_work(self, task: FinalPlan):
+        # Process final plan
+        summary = f"Summary of: {task.plan_text}"
+        self.publish_work(FinalOutput(summary=summary), input_task=task)
+
+# Simple function to build graph
+def build_graph():
+    graph = Graph(name="FactoryWorkerGraph")
+
+    # Regular workers
+    input_proc = InputProcessor()
+    output_proc = OutputProcessor(llm=get_llm())
+
+    # Factory-created SubGraphWorkers
+    planner = create_planning_worker(
+        llm=get_llm(),
+        num_variations=2
+    )
+
+    # Factory with explicit name
+    searcher = create_search_fetch_worker(
+        llm=get_llm(),
+        name="CustomSearchFetcher"
+    )
+
+    # Add workers
+    graph.add_workers(input_proc, planner, searcher, output_proc)
+
+    # Connect regular worker to factory worker
+    graph.set_dependency(input_proc, planner)
+
+    # Connect factory worker to another factory worker
+    graph.set_dependency(planner, searcher)
+
+    # Connect factory worker to regular worker
+    graph.set_dependency(searcher, output_proc)
+
+    # Set entry point
+    graph.set_entry(input_proc)
+
+    return graph
+
+def get_llm():
+    # Dummy function for the test
+    return "dummy_llm"
+"""
+
+_LLM_CONFIG_SRC = """
+from planai import Task, LLMTaskWorker, Graph, llm_from_config
+from typing import Type
+
+class QueryTask(Task):
+    query: str
+
+class ResponseTask(Task):
+    answer: str
+
+class OpenAIProcessor(LLMTaskWorker):
+    llm_input_type: Type[Task] = QueryTask
+    output_types = [ResponseTask]
+    prompt = "Answer the query: {task.query}"
+
+    def post_process(self, response, input_task):
+        return ResponseTask(answer=response.content)
+
+class AnthropicProcessor(LLMTaskWorker):
+    llm_input_type = QueryTask
+    output_types = [ResponseTask]
+    prompt = "Process this question: {task.query}"
+    system_prompt = "You are a helpful assistant."
+
+    def post_process(self, response, input_task):
+        return ResponseTask(answer=response.content)
+
+def build_graph():
+    graph = Graph(name="LLM Config Test")
+
+    # Create LLMs
+    openai_llm = llm_from_config(
+        provider="openai",
+        model_name="gpt-4",
+        max_tokens=1024
+    )
+
+    claude_llm = llm_from_config(
+        provider="anthropic",
+        model_name="claude-3-opus-20240229",
+        max_tokens=2048
+    )
+
+    # Create workers with LLMs
+    openai_worker = OpenAIProcessor(llm=openai_llm)
+    anthropic_worker = AnthropicProcessor(llm=claude_llm)
+
+    graph.add_workers(openai_worker, anthropic_worker)
+    return graph
+"""
 
 
 # Utility functions for roundtrip testing
 def parse_python_file(file_path: str) -> Dict[str, Any]:
     """Parse a Python file and return the extracted definitions."""
-    print(f"\nParsing file: {file_path}")
+    logger.debug(f"\nParsing file: {file_path}")
     definitions = get_definitions_from_python(file_path)
     print_definitions_summary(definitions)
     return definitions
 
 
+class ParsedDefinitions(NamedTuple):
+    """The definition lists returned by get_definitions_from_python."""
+
+    tasks: List[Dict]
+    workers: List[Dict]
+    edges: List[Dict]
+    imported_tasks: List[Dict]
+
+
+def _unpack(definitions: Dict[str, Any]) -> ParsedDefinitions:
+    """Look up all four definition lists at once, defaulting missing ones to []."""
+    return ParsedDefinitions(
+        definitions.get("tasks", []),
+        definitions.get("workers", []),
+        definitions.get("edges", []),
+        definitions.get("imported_tasks", []),
+    )
+
+
 def print_definitions_summary(definitions: Dict[str, Any]) -> None:
-    """Print a summary of parsed definitions."""
-    task_defs = definitions.get("tasks", [])
-    worker_defs = definitions.get("workers", [])
-    edges = definitions.get("edges", [])
-    imported_tasks = definitions.get("imported_tasks", [])
+    """Log a summary of parsed definitions at debug level."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    task_defs, worker_defs, edges, imported_tasks = _unpack(definitions)
 
-    print(
+    logger.debug(
         f"Parsed {len(task_defs)} tasks, {len(worker_defs)} workers, {len(edges)} edges, {len(imported_tasks)} imported tasks."
     )
 
     if imported_tasks:
-        print("Imported tasks:")
+        logger.debug("Imported tasks:")
         for task in imported_tasks:
-            print(f"  {task.get('className')} from {task.get('modulePath')}")
+            logger.debug(f"  {task.get('className')} from {task.get('modulePath')}")
 
     if worker_defs:
-        print("Workers:")
+        logger.debug("Workers:")
         for worker in worker_defs:
             worker_type = worker.get("workerType", "unknown")
             factory_fn = worker.get("factoryFunction", "")
-            print(
+            logger.debug(
                 f"  {worker.get('className')} ({worker_type}{': ' + factory_fn if factory_fn else ''})"
             )
 
@@ -50,13 +358,11 @@ def create_graph_data(
     edges: List[Dict],
 ) -> Dict[str, Any]:
     """Create a graph data structure for code generation."""
-    nodes = []
-
     # Add worker nodes
-    for i, worker_def in enumerate(worker_defs):
-        nodes.append(
-            {"id": f"worker_{i}", "type": worker_def["workerType"], "data": worker_def}
-        )
+    nodes = [
+        {"id": f"worker_{i}", "type": worker_def["workerType"], "data": worker_def}
+        for i, worker_def in enumerate(worker_defs)
+    ]
 
     return {
         "nodes": nodes,
@@ -67,57 +373,82 @@ def create_graph_data(
 
 
 def generate_and_parse(
-    graph_data: Dict[str, Any], temp_file_func, print_generated_code: bool = False
+    graph_data: Dict[str, Any], print_generated_code: bool = False
 ) -> Tuple[str, Dict[str, Any]]:
-    """Generate Python code from graph data, write to file, and parse again."""
+    """Generate Python code from graph data and parse it again."""
     # Generate Python code
     python_code, _, error = generate_python_module(graph_data)
     assert error is None, f"Error generating Python code: {error}"
     assert python_code is not None, "No Python code generated"
 
     if print_generated_code:
-        print("\nGenerated Python code:")
-        print(python_code)
+        logger.debug("\nGenerated Python code:")
+        logger.debug(python_code)
 
-    # Write to file and parse again
-    regen_file = temp_file_func(python_code)
-    regen_definitions = get_definitions_from_python(regen_file)
+    # Parse the generated code again
+    regen_definitions = get_definitions_from_python(code_string=python_code)
 
-    print("\nRe-parsed definitions summary:")
+    logger.debug("\nRe-parsed definitions summary:")
     print_definitions_summary(regen_definitions)
 
     return python_code, regen_definitions
 
 
+def _index_by(items: List[Dict], key: str = "className") -> Dict[str, Dict]:
+    """Index parsed definitions by one of their keys."""
+    return {item[key]: item for item in items}
+
+
+def _field_key(field: Dict[str, Any]) -> Tuple:
+    """Reduce a field definition to the properties a roundtrip must preserve."""
+    return (
+        field["name"],
+        field["type"],
+        field["isList"],
+        field["required"],
+        tuple(sorted(field.get("literalValues") or ())),
+    )
+
+
 def compare_tasks(orig_tasks: List[Dict], regen_tasks: List[Dict]) -> None:
     """Compare original and regenerated Task definitions."""
     assert len(orig_tasks) == len(regen_tasks), "Task count mismatch"
 
     # Create maps by class name
-    orig_tasks_by_name = {t["className"]: t for t in orig_tasks}
-    regen_tasks_by_name = {t["className"]: t for t in regen_tasks}
+    orig_tasks_by_name = _index_by(orig_tasks)
+    regen_tasks_by_name = _index_by(regen_tasks)
 
     # Check class names match
-    assert set(orig_tasks_by_name.keys()) == set(
-        regen_tasks_by_name.keys()
-    ), f"Task class names mismatch: {set(orig_tasks_by_name.keys())} vs {set(regen_tasks_by_name.keys())}"
+    assert (
+        orig_tasks_by_name.keys() == regen_tasks_by_name.keys()
+    ), f"Task class names mismatch: {set(orig_tasks_by_name)} vs {set(regen_tasks_by_name)}"
 
     # For each task, we could compare fields more thoroughly if needed
     # This is a basic check for now
 
 
+def _worker_view(worker: Dict[str, Any]) -> Tuple:
+    """Materialize (workerType, classVars, methods, otherMembersSource) once."""
+    return (
+        worker["workerType"],
+        worker.get("classVars") or {},
+        worker.get("methods") or {},
+        worker.get("otherMembersSource"),
+    )
+
+
 def compare_workers(orig_workers: List[Dict], regen_workers: List[Dict]) -> None:
     """Compare original and regenerated Worker definitions."""
     assert len(orig_workers) == len(regen_workers), "Worker count mismatch"
 
     # Create maps by class name
-    orig_workers_by_name = {w["className"]: w for w in orig_workers}
-    regen_workers_by_name = {w["className"]: w for w in regen_workers}
+    orig_workers_by_name = _index_by(orig_workers)
+    regen_workers_by_name = _index_by(regen_workers)
 
     # Check class names match
-    assert set(orig_workers_by_name.keys()) == set(
-        regen_workers_by_name.keys()
-    ), f"Worker class names mismatch: {set(orig_workers_by_name.keys())} vs {set(regen_workers_by_name.keys())}"
+    assert (
+        orig_workers_by_name.keys() == regen_workers_by_name.keys()
+    ), f"Worker class names mismatch: {set(orig_workers_by_name)} vs {set(regen_workers_by_name)}"
 
     # Check worker types
     for class_name, orig_worker in orig_workers_by_name.items():
@@ -127,6 +458,19 @@ def compare_workers(orig_workers: List[Dict], regen_workers: List[Dict]) -> None
         ), f"Worker type mismatch for {class_name}: {orig_worker['workerType']} vs {regen_worker['workerType']}"
 
 
+def _edge_key(edge: Dict[str, Any]) -> Tuple:
+    """Reduce an edge to (source, target, targetInputType).
+
+    The parser always sets source and target but only adds targetInputType
+    when the target worker declares an input type.
+    """
+    return (edge["source"], edge["target"], edge.get("targetInputType"))
+
+
+# Imported tasks always carry both keys, unlike edges' optional targetInputType
+_imported_task_key = itemgetter("modulePath", "className")
+
+
 def compare_edges(orig_edges: List[Dict], regen_edges: List[Dict]) -> None:
     """Compare original and regenerated edges."""
     assert len(orig_edges) == len(
@@ -134,101 +478,49 @@ def compare_edges(orig_edges: List[Dict], regen_edges: List[Dict]) -> None:
     ), f"Edge count mismatch: {len(orig_edges)} vs {len(regen_edges)}"
 
     # Convert to tuples for comparison
-    def edge_to_tuple(edge):
-        return (edge.get("source"), edge.get("target"), edge.get("targetInputType"))
-
-    orig_edge_tuples = {edge_to_tuple(e) for e in orig_edges}
-    regen_edge_tuples = {edge_to_tuple(e) for e in regen_edges}
+    orig_edge_tuples = frozenset(map(_edge_key, orig_edges))
+    regen_edge_tuples = frozenset(map(_edge_key, regen_edges))
 
     assert (
         orig_edge_tuples == regen_edge_tuples
-    ), f"Edge definitions mismatch.\nOriginal: {orig_edge_tuples}\nRegenerated: {regen_edge_tuples}"
+    ), f"Edge definitions mismatch.\nMissing: {orig_edge_tuples - regen_edge_tuples}\nUnexpected: {regen_edge_tuples - orig_edge_tuples}"
 
 
 def compare_imported_tasks(
     orig_imported: List[Dict], regen_imported: List[Dict]
 ) -> None:
     """Compare original and regenerated imported task references."""
-
     # Convert to sets of tuples for comparison
-    def imported_task_to_tuple(imp_task):
-        return (imp_task["modulePath"], imp_task["className"])
-
-    orig_imported_set = {imported_task_to_tuple(t) for t in orig_imported}
-    regen_imported_set = {imported_task_to_tuple(t) for t in regen_imported}
+    orig_imported_set = frozenset(map(_imported_task_key, orig_imported))
+    regen_imported_set = frozenset(map(_imported_task_key, regen_imported))
 
     assert (
         orig_imported_set == regen_imported_set
     ), f"Imported task definitions mismatch.\nOriginal: {orig_imported_set}\nRegenerated: {regen_imported_set}"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_planai_module():
     """Fixture that provides a sample PlanAI module with Task definitions."""
-    return """
-from pydantic import Field
-from typing import List, Optional, Literal
-from planai import Task
-
-class SimpleTask(Task):
-    name: str = Field(description="Name of the task")
-    value: int = Field(description="Task value")
-
-class ComplexTask(Task):
-    text: str = Field(description="Text content")
-    tags: List[str] = Field([], description="List of tags")
-    priority: Optional[int] = Field(None, description="Task priority")
-    status: Literal["pending", "in_progress", "completed"] = Field(..., description="Current status")
-    subtasks: List[SimpleTask] = Field([], description="List of subtasks")
-"""
-
-
-@pytest.fixture
-def temp_file():
-    """Fixture to create and clean up a temporary file."""
-    temp_files = []
+    return _SAMPLE_TASK_SRC
 
-    def _create_temp_file(content):
-        temp_file = tempfile.NamedTemporaryFile(
-            mode="w", suffix=".py", delete=False, encoding="utf-8"
-        )
-        temp_file.write(content)
-        temp_file.close()
-        temp_files.append(temp_file.name)
-        return temp_file.name
-
-    yield _create_temp_file
 
-    # Clean up temporary files
-    for file_path in temp_files:
-        try:
-            os.unlink(file_path)
-        except Exception:
-            pass
+@pytest.fixture(scope="session")
+def sample_planai_definitions(sample_planai_module):
+    """Definitions parsed from the sample module, shared across the session."""
+    return get_definitions_from_python(code_string=sample_planai_module)
 
 
-def test_task_roundtrip(sample_planai_module, temp_file):
+def test_task_roundtrip(sample_planai_definitions):
     """Test roundtrip conversion of Task definitions between Python and JSON."""
-    # Step 1: Write the sample module to a temporary file
-    original_file = temp_file(sample_planai_module)
-
-    # Step 2: Use patch.py to parse the Tasks into JSON
-    definitions = get_definitions_from_python(original_file)
+    # Step 1: Take the Tasks that patch.py parsed into JSON
+    definitions = copy.deepcopy(sample_planai_definitions)
     task_definitions = definitions["tasks"]  # Extract tasks from the dictionary
 
-    # Print for debugging if needed
-    print("\nParsed Task definitions:")
-    for task in task_definitions:
-        print(f"  {task['className']} with {len(task['fields'])} fields")
-
     # Check we found the expected tasks
     assert len(task_definitions) == 2, "Expected exactly 2 Task classes"
-    assert any(
-        t["className"] == "SimpleTask" for t in task_definitions
-    ), "SimpleTask not found"
-    assert any(
-        t["className"] == "ComplexTask" for t in task_definitions
-    ), "ComplexTask not found"
+    task_names = {t["className"] for t in task_definitions}
+    assert {"SimpleTask", "ComplexTask"} <= task_names, f"Found tasks: {task_names}"
 
     # Step 3: Prepare the graph data structure expected by python.py
     # Create nodes for each Task
@@ -241,170 +533,62 @@ def test_task_roundtrip(sample_planai_module, temp_file):
     assert error is None, f"Error generating Python code: {error}"
     assert python_code is not None, "No Python code was generated"
 
-    # Step 5: Write the generated code to a new temporary file
-    regen_file = temp_file(python_code)
-
-    # Step 6: Parse the regenerated file to validate Task definitions
-    regen_definitions = get_definitions_from_python(regen_file)
+    # Step 5: Parse the regenerated code to validate Task definitions
+    regen_definitions = get_definitions_from_python(code_string=python_code)
     regen_task_definitions = regen_definitions["tasks"]  # Extract tasks
 
-    # Print for debugging if needed
-    print("\nRegenerated Task definitions:")
-    for task in regen_task_definitions:
-        print(f"  {task['className']} with {len(task['fields'])} fields")
-
     # Step 7: Compare original and regenerated Task definitions
-    assert len(task_definitions) == len(
-        regen_task_definitions
-    ), "Number of Task classes doesn't match"
+    assert len(task_definitions) == len(regen_task_definitions), (
+        "Number of Task classes doesn't match; regenerated="
+        f"{[t['className'] for t in regen_task_definitions]}"
+    )
 
     # Map task definitions by class name for easier comparison
-    orig_tasks_by_name = {task["className"]: task for task in task_definitions}
-    regen_tasks_by_name = {task["className"]: task for task in regen_task_definitions}
+    orig_tasks_by_name = _index_by(task_definitions)
+    regen_tasks_by_name = _index_by(regen_task_definitions)
 
     # Check that all original tasks were regenerated with the same properties
+    assert (
+        orig_tasks_by_name.keys() == regen_tasks_by_name.keys()
+    ), f"Task names mismatch: {set(orig_tasks_by_name)} vs {set(regen_tasks_by_name)}"
     for class_name, orig_task in orig_tasks_by_name.items():
-        assert (
-            class_name in regen_tasks_by_name
-        ), f"Task {class_name} missing in regenerated code"
-
         regen_task = regen_tasks_by_name[class_name]
 
-        # Compare fields by name
-        orig_fields_by_name = {field["name"]: field for field in orig_task["fields"]}
-        regen_fields_by_name = {field["name"]: field for field in regen_task["fields"]}
-
-        assert len(orig_fields_by_name) == len(
-            regen_fields_by_name
-        ), f"Number of fields in {class_name} doesn't match"
-
-        for field_name, orig_field in orig_fields_by_name.items():
-            assert (
-                field_name in regen_fields_by_name
-            ), f"Field {field_name} missing in regenerated {class_name}"
-
-            regen_field = regen_fields_by_name[field_name]
-
-            # Compare essential field properties
-            assert (
-                orig_field["type"] == regen_field["type"]
-            ), f"Type mismatch for {class_name}.{field_name}"
-            assert (
-                orig_field["isList"] == regen_field["isList"]
-            ), f"isList mismatch for {class_name}.{field_name}"
-            assert (
-                orig_field["required"] == regen_field["required"]
-            ), f"required mismatch for {class_name}.{field_name}"
-
-            # If it's a literal type, check the literal values
-            if orig_field["type"] == "literal" and "literalValues" in orig_field:
-                assert (
-                    "literalValues" in regen_field
-                ), f"literalValues missing for {class_name}.{field_name}"
-                assert set(orig_field["literalValues"]) == set(
-                    regen_field["literalValues"]
-                ), f"literalValues mismatch for {class_name}.{field_name}"
+        # Compare the essential properties of all fields as one set
+        orig_field_keys = {_field_key(field) for field in orig_task["fields"]}
+        regen_field_keys = {_field_key(field) for field in regen_task["fields"]}
+        assert (
+            orig_field_keys == regen_field_keys
+        ), f"Field definitions of {class_name} don't match"
 
 
-def test_worker_roundtrip(temp_file):
+def test_worker_roundtrip():
     """Test roundtrip conversion of Worker definitions between Python and JSON."""
-    original_code = """
-from pydantic import Field
-from typing import List, Optional, Literal, Type
-from planai import Task, TaskWorker, LLMTaskWorker, JoinedTaskWorker, CachedLLMTaskWorker
-from textwrap import dedent
-
-# --- Task Definitions ---
-class InputTask(Task):
-    data: str
-
-class OutputTask(Task):
-    result: str
-
-class AnalysisTask(Task):
-    analysis: dict
-
-class FinalReport(Task):
-    report: str
-
-class JoinedInput(Task):
-    value: int
-
-class CollectionTask(Task):
-    items: List[str]
-
-# --- Worker Definitions ---
-
-class BasicWorker(TaskWorker):
-    output_types: List[Type[Task]] = [OutputTask]
-    CUSTOM_VAR = "hello"
-
-    def consume_work(self, task: InputTask):
-        # Basic processing
-        processed = task.data.upper()
-        self.publish_work(OutputTask(result=processed), input_task=task)
-
-    def _helper_method(self):
-        return self.CUSTOM_VAR
-
-class AdvancedLLMWorker(CachedLLMTaskWorker):
-    llm_input_type = InputTask
-    llm_output_type = AnalysisTask
-    output_types = [AnalysisTask] # Explicitly define if different from llm_output_type
-    debug_mode = True
-    prompt: str = dedent(\"""
-        Analyze the input data: {task.data}
-        Provide the analysis.
-        \""").strip()
-    system_prompt: str = "You are an analyst."
-
-    # Optional methods
-    def extra_cache_key(self, task: InputTask) -> str:
-        return task.data[:10] # Cache based on first 10 chars
-
-    def post_process(self, respponse: AnalysisTask, input_task: InputTask):
-        # Modify the analysis after LLM
-        task.analysis['timestamp'] = "now"
-        return task
-
-class DataCollectorWorker(JoinedTaskWorker):
-    join_type: Type[TaskWorker] = BasicWorker # Join on BasicWorker outputs
-    output_types: List[Type[Task]] = [CollectionTask]
-
-    def consume_work_joined(self, tasks: List[OutputTask]):
-        # Collect results from BasicWorker
-        collected_items = [t.result for t in tasks]
-        self.publish_work(CollectionTask(items=collected_items), input_task=tasks[0])
-
-"""
-    original_file = temp_file(original_code)
-
-    # Step 1: Parse original file
-    definitions = get_definitions_from_python(original_file)
+    original_code = _WORKER_SRC
+    # Step 1: Parse original code
+    definitions = get_definitions_from_python(code_string=original_code)
     task_defs = definitions["tasks"]
     worker_defs = definitions["workers"]
 
-    print("\nParsed Worker definitions:")
-    for worker in worker_defs:
-        print(f"  {worker['className']} ({worker['workerType']})")
-
-    assert len(worker_defs) == 3, f"Expected 3 worker classes, got {len(worker_defs)}"
-
-    # Step 2: Create graph data for regeneration
-    task_nodes = []
-    for i, task_def in enumerate(task_defs):
-        task_nodes.append({"id": f"task_{i}", "type": "task", "data": task_def})
-
-    worker_nodes = []
-    for i, worker_def in enumerate(worker_defs):
-        worker_nodes.append(
-            {
-                "id": f"worker_{i}",
-                "type": worker_def["workerType"],  # Use parsed worker type
-                "data": worker_def,  # Pass the whole parsed data back
-            }
-        )
-
+    assert (
+        len(worker_defs) == 3
+    ), f"Expected 3 worker classes, got {[w['className'] for w in worker_defs]}"
+
+    # Step 2: Create graph data for regeneration
+    task_nodes = [
+        {"id": f"task_{i}", "type": "task", "data": task_def}
+        for i, task_def in enumerate(task_defs)
+    ]
+
+    worker_nodes = [
+        {
+            "id": f"worker_{i}",
+            "type": worker_def["workerType"],  # Use parsed worker type
+            "data": worker_def,  # Pass the whole parsed data back
+        }
+        for i, worker_def in enumerate(worker_defs)
+    ]
+
     graph_data = {"nodes": task_nodes + worker_nodes, "edges": []}
 
     # Step 3: Regenerate Python code
@@ -412,49 +596,44 @@ class DataCollectorWorker(JoinedTaskWorker):
     assert error is None, f"Error generating Python code: {error}"
     assert python_code is not None, "No Python code generated"
 
-    # Step 4: Write and parse regenerated code
-    regen_file = temp_file(python_code)
-    regen_definitions = get_definitions_from_python(regen_file)
+    # Step 4: Parse regenerated code
+    regen_definitions = get_definitions_from_python(code_string=python_code)
     regen_worker_defs = regen_definitions["workers"]
 
-    print("\nRegenerated Worker definitions:")
-    for worker in regen_worker_defs:
-        print(f"  {worker['className']} ({worker['workerType']})")
-
     # Step 5: Compare original and regenerated worker definitions
-    assert len(worker_defs) == len(regen_worker_defs), "Number of workers mismatch"
+    assert len(worker_defs) == len(
+        regen_worker_defs
+    ), f"Number of workers mismatch; regenerated={[w['className'] for w in regen_worker_defs]}"
 
-    orig_workers_by_name = {w["className"]: w for w in worker_defs}
-    regen_workers_by_name = {w["className"]: w for w in regen_worker_defs}
+    orig_workers_by_name = {w["className"]: _worker_view(w) for w in worker_defs}
+    regen_workers_by_name = {w["className"]: _worker_view(w) for w in regen_worker_defs}
+    regen_cached = {w["className"]: w.get("isCached") for w in regen_worker_defs}
 
-    for name, orig_worker in orig_workers_by_name.items():
-        assert (
-            name in regen_workers_by_name
-        ), f"Worker {name} missing in regenerated code"
-        regen_worker = regen_workers_by_name[name]
+    assert (
+        orig_workers_by_name.keys() == regen_workers_by_name.keys()
+    ), f"Worker names mismatch: {set(orig_workers_by_name)} vs {set(regen_workers_by_name)}"
+    for name, orig_view in orig_workers_by_name.items():
+        orig_type, orig_vars, orig_methods, orig_other = orig_view
+        regen_type, regen_vars, regen_methods, regen_other = regen_workers_by_name[name]
 
-        assert (
-            orig_worker["workerType"] == regen_worker["workerType"]
-        ), f"Worker type mismatch for {name}"
+        assert orig_type == regen_type, f"Worker type mismatch for {name}"
 
         if name == "AdvancedLLMWorker":
             assert (
-                regen_worker["workerType"] == "llmtaskworker"
-            ), f"Expected AdvancedLLMWorker to be LLMTaskWorker, got {regen_worker['workerType']}"
-            assert regen_worker["isCached"], "Expected AdvancedLLMWorker to be cached"
+                regen_type == "llmtaskworker"
+            ), f"Expected AdvancedLLMWorker to be LLMTaskWorker, got {regen_type}"
+            assert regen_cached[name], "Expected AdvancedLLMWorker to be cached"
 
         # Compare classVars (basic check for key presence and simple values)
-        orig_vars = orig_worker.get("classVars", {})
-        regen_vars = regen_worker.get("classVars", {})
         # Don't compare prompts directly due to potential formatting nuances
-        keys_to_compare = set(orig_vars.keys()) - {"prompt", "system_prompt"}
+        keys_to_compare = orig_vars.keys() - _PROMPT_VARS
         assert keys_to_compare == (
-            set(regen_vars.keys()) - {"prompt", "system_prompt"}
+            regen_vars.keys() - _PROMPT_VARS
         ), f"Class var keys mismatch for {name}: {orig_vars.keys()} != {regen_vars.keys()}"
         for key in keys_to_compare:
             # Special handling for output_types list comparison
             if key == "output_types":
-                assert set(orig_vars[key]) == set(
+                assert sorted(orig_vars[key]) == sorted(
                     regen_vars[key]
                 ), f"Output types mismatch for {name}"
             else:
@@ -463,43 +642,50 @@ class DataCollectorWorker(JoinedTaskWorker):
                 ), f"Class var '{key}' mismatch for {name}"
 
         # Compare methods (check for presence)
-        orig_methods = orig_worker.get("methods", {})
-        regen_methods = regen_worker.get("methods", {})
-        assert set(orig_methods.keys()) == set(
-            regen_methods.keys()
+        assert (
+            orig_methods.keys() == regen_methods.keys()
         ), f"Method keys mismatch for {name}"
         # Note: Direct string comparison of regenerated code can be brittle.
 
-        # Compare otherMembersSource (presence check)
-        assert ("otherMembersSource" in orig_worker) == (
-            "otherMembersSource" in regen_worker
+        # Compare otherMembersSource; regeneration may reformat it, so ignore
+        # whitespace
+        assert (orig_other is None) == (
+            regen_other is None
         ), f"Other members presence mismatch for {name}"
-        if "otherMembersSource" in orig_worker and orig_worker["otherMembersSource"]:
-            assert regen_worker.get(
-                "otherMembersSource"
-            ), f"Regenerated {name} missing other members source"
-            # More detailed comparison is tricky, check if helper method is there
+        if orig_other:
+            assert regen_other, f"Regenerated {name} missing other members source"
+            assert orig_other.translate(_STRIP_WHITESPACE) == regen_other.translate(
+                _STRIP_WHITESPACE
+            ), f"Other members source mismatch for {name}"
             if name == "BasicWorker":
-                assert "_helper_method" in regen_worker["otherMembersSource"]
+                assert "_helper_method" in regen_other
 
 
-def test_releasenotes_roundtrip(temp_file):
-    """Test roundtrip conversion of a complex example with multiple workers and edges."""
-    # Define the path to the original releasenotes example
-    original_file_path = (
-        Path(__file__).parent.parent
-        / "planaieditor"
-        / "codesnippets"
-        / "releasenotes.py"
-    )
+# Complete example programs that must survive a roundtrip unchanged
+EXAMPLE_FILES = {
+    "releasenotes": Path(__file__).parent.parent
+    / "planaieditor"
+    / "codesnippets"
+    / "releasenotes.py",
+    "deepsearch": Path(__file__).parent / "e2e" / "fixtures" / "deepsearch_fixture.py",
+}
+
+
+@pytest.fixture(scope="session", params=sorted(EXAMPLE_FILES))
+def example_definitions(request):
+    """Definitions parsed from each example file, shared across the session."""
+    original_file_path = EXAMPLE_FILES[request.param]
     assert original_file_path.exists(), f"Original file not found: {original_file_path}"
+    return request.param, parse_python_file(str(original_file_path))
+
 
-    # Parse original file
-    definitions = parse_python_file(str(original_file_path))
-    orig_task_defs = definitions.get("tasks", [])
-    orig_worker_defs = definitions.get("workers", [])
-    orig_edges = definitions.get("edges", [])
-    orig_imported_tasks = definitions.get("imported_tasks", [])
+def test_example_file_roundtrip(example_definitions):
+    """Test roundtrip conversion of complete examples with multiple workers and edges."""
+    name, definitions = example_definitions
+    definitions = copy.deepcopy(definitions)
+    orig_task_defs, orig_worker_defs, orig_edges, orig_imported_tasks = _unpack(
+        definitions
+    )
 
     # Create graph data structure for regeneration
     graph_data = create_graph_data(
@@ -508,14 +694,13 @@ def test_releasenotes_roundtrip(temp_file):
 
     # Generate Python code and parse it again
     _, regen_definitions = generate_and_parse(
-        graph_data, temp_file, print_generated_code=False  # Set to True to debug
+        graph_data, print_generated_code=False  # Set to True to debug
     )
 
     # Get regenerated components
-    regen_task_defs = regen_definitions.get("tasks", [])
-    regen_worker_defs = regen_definitions.get("workers", [])
-    regen_edges = regen_definitions.get("edges", [])
-    regen_imported_tasks = regen_definitions.get("imported_tasks", [])
+    regen_task_defs, regen_worker_defs, regen_edges, regen_imported_tasks = _unpack(
+        regen_definitions
+    )
 
     # Compare components
     compare_tasks(orig_task_defs, regen_task_defs)
@@ -524,88 +709,51 @@ def test_releasenotes_roundtrip(temp_file):
     compare_imported_tasks(orig_imported_tasks, regen_imported_tasks)
 
     # Print a summary of the test
-    print("\nReleasenotes roundtrip summary:")
-    print(
+    logger.debug(f"\n{name} roundtrip summary:")
+    logger.debug(
         f"Original tasks: {len(orig_task_defs)}, Regenerated tasks: {len(regen_task_defs)}"
     )
-    print(
+    logger.debug(
         f"Original workers: {len(orig_worker_defs)}, Regenerated workers: {len(regen_worker_defs)}"
     )
-    print(f"Original edges: {len(orig_edges)}, Regenerated edges: {len(regen_edges)}")
-    print(
+    logger.debug(
+        f"Original edges: {len(orig_edges)}, Regenerated edges: {len(regen_edges)}"
+    )
+    logger.debug(
         f"Original imported tasks: {len(orig_imported_tasks)}, Regenerated imported tasks: {len(regen_imported_tasks)}"
     )
 
 
-def test_imported_task_roundtrip(temp_file):
+def test_imported_task_roundtrip():
     """Test roundtrip involving imported Task nodes."""
-    original_code = """
-from planai import Task, TaskWorker, Graph
-from planai.patterns import SearchQuery, SearchResult # Allowed import
-from typing import List, Type
-
-# Local Task
-class ProcessedResult(Task):
-    processed_data: str
-
-# Worker using imported Task
-class SearchProcessor(TaskWorker):
-    output_types: List[Type[Task]] = [ProcessedResult]
-
-    def consume_work(self, task: SearchQuery):
-        # Dummy processing
-        print(f"Processing search query: {task.query_text}")
-        self.publish_work(ProcessedResult(processed_data=task.query_text.upper()))
-
-# Another worker using local task
-class ResultAggregator(TaskWorker):
-    def consume_work(self, task: ProcessedResult):
-        print(f"Aggregating: {task.processed_data}")
-
-# Graph setup function (simplified for test)
-def setup_graph():
-    graph = Graph(name="ImportTestGraph")
-    search_proc = SearchProcessor()
-    aggregator = ResultAggregator()
-
-    graph.add_workers(search_proc, aggregator)
-    graph.set_dependency(search_proc, aggregator)
-    graph.set_entry(search_proc)
-    return graph
-
-"""
-    original_file = temp_file(original_code)
-
-    # Step 1: Parse original file
-    print(f"\nParsing original file for imported task roundtrip: {original_file}")
-    definitions = get_definitions_from_python(original_file)
-    orig_task_defs = definitions.get("tasks", [])
-    orig_worker_defs = definitions.get("workers", [])
-    orig_edges = definitions.get("edges", [])
-    orig_imported_tasks = definitions.get("imported_tasks", [])
+    original_code = _IMPORTED_SRC
+    # Step 1: Parse original code
+    logger.debug("\nParsing original code for imported task roundtrip")
+    definitions = get_definitions_from_python(code_string=original_code)
+    orig_task_defs, orig_worker_defs, orig_edges, orig_imported_tasks = _unpack(
+        definitions
+    )
 
-    print(f"Parsed {len(orig_task_defs)} local tasks.")
-    print(f"Parsed {len(orig_imported_tasks)} imported tasks: {orig_imported_tasks}")
-    print(f"Parsed {len(orig_worker_defs)} workers.")
-    print(f"Parsed {len(orig_edges)} edges.")
+    logger.debug(f"Parsed {len(orig_task_defs)} local tasks.")
+    logger.debug(
+        f"Parsed {len(orig_imported_tasks)} imported tasks: {orig_imported_tasks}"
+    )
+    logger.debug(f"Parsed {len(orig_worker_defs)} workers.")
+    logger.debug(f"Parsed {len(orig_edges)} edges.")
 
     # Verify initial parsing found the imported task
     assert (
         len(orig_imported_tasks) == 2
     ), "Expected 2 imported tasks (SearchQuery, SearchResult)"
-    assert any(t["className"] == "SearchQuery" for t in orig_imported_tasks)
-    assert any(t["className"] == "SearchResult" for t in orig_imported_tasks)
-    assert any(t["modulePath"] == "planai.patterns" for t in orig_imported_tasks)
+    assert set(map(_imported_task_key, orig_imported_tasks)) == {
+        ("planai.patterns", "SearchQuery"),
+        ("planai.patterns", "SearchResult"),
+    }
 
-    worker_nodes = []
-    for i, worker_def in enumerate(orig_worker_defs):
-        worker_nodes.append(
-            {
-                "id": f"worker_{i}",
-                "type": worker_def["workerType"],
-                "data": worker_def,
-            }
-        )
+    worker_nodes = [
+        {"id": f"worker_{i}", "type": worker_def["workerType"], "data": worker_def}
+        for i, worker_def in enumerate(orig_worker_defs)
+    ]
 
     # Combine nodes and include original edges
     graph_data = {
@@ -616,7 +764,7 @@ def setup_graph():
     }
 
     # Step 3: Regenerate Python code
-    print("\nRegenerating Python code with imported tasks...")
+    logger.debug("\nRegenerating Python code with imported tasks...")
     python_code, _, error = generate_python_module(graph_data)
     assert error is None, f"Error generating Python code: {error}"
     assert python_code is not None, "No Python code generated"
@@ -624,21 +772,18 @@ def setup_graph():
     # Check if the import statement was added correctly by python.py
     assert "from planai.patterns import SearchQuery, SearchResult" in python_code
 
-    # Step 4: Write and parse regenerated code
-    regen_file = temp_file(python_code)
-    print(f"Parsing regenerated file: {regen_file}")
-    regen_definitions = get_definitions_from_python(regen_file)
-    regen_task_defs = regen_definitions.get("tasks", [])
-    regen_worker_defs = regen_definitions.get("workers", [])
-    regen_edges = regen_definitions.get("edges", [])
-    regen_imported_tasks = regen_definitions.get("imported_tasks", [])
+    # Step 4: Parse regenerated code
+    regen_definitions = get_definitions_from_python(code_string=python_code)
+    regen_task_defs, regen_worker_defs, regen_edges, regen_imported_tasks = _unpack(
+        regen_definitions
+    )
 
-    print(f"Regenerated {len(regen_task_defs)} local tasks.")
-    print(
+    logger.debug(f"Regenerated {len(regen_task_defs)} local tasks.")
+    logger.debug(
         f"Regenerated {len(regen_imported_tasks)} imported tasks: {regen_imported_tasks}"
     )
-    print(f"Regenerated {len(regen_worker_defs)} workers.")
-    print(f"Regenerated {len(regen_edges)} edges.")
+    logger.debug(f"Regenerated {len(regen_worker_defs)} workers.")
+    logger.debug(f"Regenerated {len(regen_edges)} edges.")
 
     # Step 5: Compare regenerated results with original
     # Compare local tasks, workers, edges (basic counts and names for brevity)
@@ -656,157 +801,47 @@ def setup_graph():
     # Could add detailed edge comparison if needed
 
     # *** Crucial: Compare the list of IMPORTED tasks ***
-    def imported_task_to_tuple(imp_task):
-        return (imp_task["modulePath"], imp_task["className"])
-
-    orig_imported_set = {imported_task_to_tuple(t) for t in orig_imported_tasks}
-    regen_imported_set = {imported_task_to_tuple(t) for t in regen_imported_tasks}
+    orig_imported_set = set(map(_imported_task_key, orig_imported_tasks))
+    regen_imported_set = set(map(_imported_task_key, regen_imported_tasks))
 
     assert (
         orig_imported_set == regen_imported_set
     ), f"Imported task definitions mismatch.\nOriginal: {orig_imported_set}\nRegenerated: {regen_imported_set}"
 
 
-def test_subgraph_factory_roundtrip(temp_file):
+def test_subgraph_factory_roundtrip():
     """Test roundtrip conversion of factory-created SubGraphWorkers between Python and JSON."""
-    original_code = """
-from pydantic import Field
-from typing import List, Type
-from planai import Task, TaskWorker, Graph, LLMTaskWorker
-from planai.patterns import PlanRequest, FinalPlan, SearchQuery, ConsolidatedPages
-from planai.patterns import create_planning_worker, create_search_fetch_worker
-
-# --- Task Definitions ---
-class InitialRequest(Task):
-    query: str
-
-class ProcessedResult(Task):
-    processed_data: str
-
-class FinalOutput(Task):
-    summary: str
-
-# --- Worker Definitions ---
-class InputProcessor(TaskWorker):
-    output_types: List[Type[Task]] = [PlanRequest]
-
-    def consume_work(self, task: InitialRequest):
-        # Convert to PlanRequest
-        plan_req = PlanRequest(query_text=task.query)
-        self.publish_work(plan_req, input_task=task)
-
-class OutputProcessor(LLMTaskWorker):
-    llm_input_type = FinalPlan
-    output_types = [FinalOutput]
-    prompt: str = "Summarize the final plan: {task.plan_text}"
-
-    def consume_work(self, task: FinalPlan):
-        # Process final plan
-        summary = f"Summary of: {task.plan_text}"
-        self.publish_work(FinalOutput(summary=summary), input_task=task)
-
-# Simple function to build graph
-def build_graph():
-    graph = Graph(name="FactoryWorkerGraph")
-
-    # Regular workers
-    input_proc = InputProcessor()
-    output_proc = OutputProcessor(llm=get_llm())
-
-    # Factory-created SubGraphWorkers
-    planner = create_planning_worker(
-        llm=get_llm(),
-        num_variations=2
-    )
-
-    # Factory with explicit name
-    searcher = create_search_fetch_worker(
-        llm=get_llm(),
-        name="CustomSearchFetcher"
-    )
-
-    # Add workers
-    graph.add_workers(input_proc, planner, searcher, output_proc)
-
-    # Connect regular worker to factory worker
-    graph.set_dependency(input_proc, planner)
-
-    # Connect factory worker to another factory worker
-    graph.set_dependency(planner, searcher)
-
-    # Connect factory worker to regular worker
-    graph.set_dependency(searcher, output_proc)
-
-    # Set entry point
-    graph.set_entry(input_proc)
-
-    return graph
-
-def get_llm():
-    # Dummy function for the test
-    return "dummy_llm"
-"""
-    original_file = temp_file(original_code)
-
-    # Step 1: Parse original file
-    definitions = get_definitions_from_python(original_file)
+    original_code = _SUBGRAPH_SRC
+    # Step 1: Parse original code
+    definitions = get_definitions_from_python(code_string=original_code)
     task_defs = definitions["tasks"]
     worker_defs = definitions["workers"]
     edges = definitions["edges"]
     imported_tasks = definitions.get("imported_tasks", [])  # Important for this test
 
-    print("\nParsed Task definitions:")
-    print(f"  Local tasks: {len(task_defs)}")
-    for task in task_defs:
-        print(f"    {task['className']}")
-
-    print(f"  Imported tasks: {len(imported_tasks)}")
-    for task in imported_tasks:
-        print(f"    {task['className']} from {task['modulePath']}")
-
-    print("\nParsed Worker definitions:")
-    for worker in worker_defs:
-        worker_type = worker.get("workerType", "unknown")
-        factory_fn = worker.get("factoryFunction", "")
-        print(
-            f"  {worker['className']} ({worker_type}{': ' + factory_fn if factory_fn else ''})"
-        )
-
-    print("\nParsed Edges:")
-    for edge in edges:
-        print(f"  {edge.get('source', '?')} -> {edge.get('target', '?')}")
-
     # Verify imported tasks
     assert (
         len(imported_tasks) >= 4
     ), f"Expected at least 4 imported tasks, got {len(imported_tasks)}"
     imported_task_names = {task["className"] for task in imported_tasks}
-    for name in ["PlanRequest", "FinalPlan", "SearchQuery", "ConsolidatedPages"]:
-        assert (
-            name in imported_task_names
-        ), f"Imported task '{name}' not found in {imported_task_names}"
+    assert (
+        _PATTERN_TASKS <= imported_task_names
+    ), f"Imported tasks {_PATTERN_TASKS - imported_task_names} not found in {imported_task_names}"
 
     # Verify we found the factory-created workers
     # Find workers by class name
-    planner = next(
-        (
-            w
-            for w in worker_defs
-            if w.get("factoryFunction") == "create_planning_worker"
-        ),
-        None,
-    )
-    searcher = next(
-        (
-            w
-            for w in worker_defs
-            if w.get("factoryFunction") == "create_search_fetch_worker"
-        ),
-        None,
-    )
+    workers_by_factory = {
+        w["factoryFunction"]: w for w in worker_defs if w.get("factoryFunction")
+    }
+    planner = workers_by_factory.get("create_planning_worker")
+    searcher = workers_by_factory.get("create_search_fetch_worker")
 
-    assert planner is not None, "Factory-created planning worker not found"
-    assert searcher is not None, "Factory-created search worker not found"
+    assert (
+        planner is not None
+    ), f"Factory planner not found; workers={[w['className'] for w in worker_defs]}"
+    assert (
+        searcher is not None
+    ), f"Factory searcher not found; workers={[w['className'] for w in worker_defs]}"
     assert (
         planner["workerType"] == "subgraphworker"
     ), "Planner should be a subgraphworker"
@@ -818,48 +853,31 @@ def get_llm():
     ), "Custom name not preserved for searcher"
 
     # Verify we have the expected edges
-    assert len(edges) == 3, f"Expected 3 edges, got {len(edges)}"
+    assert (
+        len(edges) == 3
+    ), f"Expected 3 edges, got {[(e['source'], e['target']) for e in edges]}"
 
     # Find edges by matching source and target
-    edge1 = next(
-        (
-            e
-            for e in edges
-            if e.get("source") == "InputProcessor"
-            and e.get("target") == planner["className"]
-        ),
-        None,
-    )
-    edge2 = next(
-        (
-            e
-            for e in edges
-            if e.get("source") == planner["className"]
-            and e.get("target") == searcher["className"]
-        ),
-        None,
-    )
-    edge3 = next(
-        (
-            e
-            for e in edges
-            if e.get("source") == searcher["className"]
-            and e.get("target") == "OutputProcessor"
-        ),
-        None,
-    )
-
-    assert edge1 is not None, "Edge from InputProcessor to Planner not found"
-    assert edge2 is not None, "Edge from Planner to Searcher not found"
-    assert edge3 is not None, "Edge from Searcher to OutputProcessor not found"
+    edge_pairs = {(e["source"], e["target"]) for e in edges}
+    assert (
+        "InputProcessor",
+        planner["className"],
+    ) in edge_pairs, "Edge from InputProcessor to Planner not found"
+    assert (
+        planner["className"],
+        searcher["className"],
+    ) in edge_pairs, "Edge from Planner to Searcher not found"
+    assert (
+        searcher["className"],
+        "OutputProcessor",
+    ) in edge_pairs, "Edge from Searcher to OutputProcessor not found"
 
     # Step 2: Create graph data for code generation
-    nodes = []
-
     # Add worker nodes (both regular and factory-created)
-    for i, worker_def in enumerate(worker_defs):
-        worker_type = worker_def["workerType"]
-        nodes.append({"id": f"worker_{i}", "type": worker_type, "data": worker_def})
+    nodes = [
+        {"id": f"worker_{i}", "type": worker_def["workerType"], "data": worker_def}
+        for i, worker_def in enumerate(worker_defs)
+    ]
 
     graph_data = {
         "nodes": nodes,
@@ -873,83 +891,53 @@ def get_llm():
     assert error is None, f"Error generating Python code: {error}"
     assert python_code is not None, "No Python code generated"
 
-    print("\nGenerated Python code:")
-    print(python_code)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("\nGenerated Python code:")
+        logger.debug(python_code)
 
     # Check if imported tasks are included in the imports
     assert (
         "from planai.patterns import " in python_code
     ), "Imported tasks not included in imports"
-    for name in ["PlanRequest", "FinalPlan", "SearchQuery", "ConsolidatedPages"]:
-        assert (
-            name in python_code
-        ), f"Imported task '{name}' not included in the generated code"
+    found_pattern_tasks = set(_PATTERN_TASK_RE.findall(python_code))
+    assert (
+        found_pattern_tasks == _PATTERN_TASKS
+    ), f"Imported tasks {_PATTERN_TASKS - found_pattern_tasks} not included in the generated code"
 
     # Check if factory functions are called correctly with exact arguments
 
-    # remove all whitespace includign newlines
-    expected_planner_call = (
-        "create_planning_worker(llm=get_llm(), num_variations=2)"
-    ).replace(" ", "")
-    replaced_python_code = python_code.replace(" ", "").replace("\n", "")
+    # remove all whitespace including newlines
+    replaced_python_code = python_code.translate(_STRIP_WHITESPACE)
     assert (
-        expected_planner_call in replaced_python_code
-    ), f'Expected call "{expected_planner_call}" not found or incorrect in generated code.'
+        _EXPECTED_PLANNER_CALL in replaced_python_code
+    ), f'Expected call "{_EXPECTED_PLANNER_CALL}" not found or incorrect in generated code.'
 
     # Check search fetcher call with name
-    expected_searcher_call = (
-        'create_search_fetch_worker(llm=get_llm(), name="CustomSearchFetcher")'
-    ).replace(" ", "")
     assert (
-        expected_searcher_call in replaced_python_code
-    ), f'Expected call "{expected_searcher_call}" not found or incorrect in generated code.'
+        _EXPECTED_SEARCHER_CALL in replaced_python_code
+    ), f'Expected call "{_EXPECTED_SEARCHER_CALL}" not found or incorrect in generated code.'
 
-    # Step 4: Write and parse the regenerated code
-    regen_file = temp_file(python_code)
-    regen_definitions = get_definitions_from_python(regen_file)
+    # Step 4: Parse the regenerated code
+    regen_definitions = get_definitions_from_python(code_string=python_code)
     regen_worker_defs = regen_definitions["workers"]
     regen_edges = regen_definitions["edges"]
     regen_imported_tasks = regen_definitions.get("imported_tasks", [])
 
-    print("\nRegenparsed Worker definitions:")
-    for worker in regen_worker_defs:
-        worker_type = worker.get("workerType", "unknown")
-        factory_fn = worker.get("factoryFunction", "")
-        print(
-            f"  {worker['className']} ({worker_type}{': ' + factory_fn if factory_fn else ''})"
-        )
-
-    print("\nRegenparsed Imported Tasks:")
-    for task in regen_imported_tasks:
-        print(f"  {task['className']} from {task['modulePath']}")
-
     # Verify imported tasks were preserved
     assert (
         len(regen_imported_tasks) >= 4
     ), f"Expected at least 4 imported tasks in regenerated code, got {len(regen_imported_tasks)}"
     regen_imported_task_names = {task["className"] for task in regen_imported_tasks}
-    for name in ["PlanRequest", "FinalPlan", "SearchQuery", "ConsolidatedPages"]:
-        assert (
-            name in regen_imported_task_names
-        ), f"Imported task '{name}' not found in regenerated code"
+    assert (
+        _PATTERN_TASKS <= regen_imported_task_names
+    ), f"Imported tasks {_PATTERN_TASKS - regen_imported_task_names} not found in regenerated code"
 
     # Verify regenerated code contains factory workers
-    regen_planner = next(
-        (
-            w
-            for w in regen_worker_defs
-            if w.get("factoryFunction") == "create_planning_worker"
-        ),
-        None,
-    )
-    regen_searcher = next(
-        (
-            w
-            for w in regen_worker_defs
-            if w.get("factoryFunction") == "create_search_fetch_worker"
-        ),
-        None,
-    )
+    regen_workers_by_factory = {
+        w["factoryFunction"]: w for w in regen_worker_defs if w.get("factoryFunction")
+    }
+    regen_planner = regen_workers_by_factory.get("create_planning_worker")
+    regen_searcher = regen_workers_by_factory.get("create_search_fetch_worker")
 
     assert (
         regen_planner is not None
@@ -967,71 +955,14 @@ def get_llm():
     ), f"Expected 3 edges in regenerated code, got {len(regen_edges)}"
 
 
-def test_llm_config_roundtrip(temp_file):
+def test_llm_config_roundtrip():
     """Test roundtrip conversion of LLM configurations between Python and JSON."""
-    original_code = """
-from planai import Task, LLMTaskWorker, Graph, llm_from_config
-from typing import Type
-
-class QueryTask(Task):
-    query: str
-
-class ResponseTask(Task):
-    answer: str
-
-class OpenAIProcessor(LLMTaskWorker):
-    llm_input_type: Type[Task] = QueryTask
-    output_types = [ResponseTask]
-    prompt = "Answer the query: {task.query}"
-
-    def post_process(self, response, input_task):
-        return ResponseTask(answer=response.content)
-
-class AnthropicProcessor(LLMTaskWorker):
-    llm_input_type = QueryTask
-    output_types = [ResponseTask]
-    prompt = "Process this question: {task.query}"
-    system_prompt = "You are a helpful assistant."
-
-    def post_process(self, response, input_task):
-        return ResponseTask(answer=response.content)
-
-def build_graph():
-    graph = Graph(name="LLM Config Test")
-
-    # Create LLMs
-    openai_llm = llm_from_config(
-        provider="openai",
-        model_name="gpt-4",
-        max_tokens=1024
-    )
-
-    claude_llm = llm_from_config(
-        provider="anthropic",
-        model_name="claude-3-opus-20240229",
-        max_tokens=2048
-    )
-
-    # Create workers with LLMs
-    openai_worker = OpenAIProcessor(llm=openai_llm)
-    anthropic_worker = AnthropicProcessor(llm=claude_llm)
-
-    graph.add_workers(openai_worker, anthropic_worker)
-    return graph
-"""
-    original_file = temp_file(original_code)
-
-    # Step 1: Parse original file
-    definitions = get_definitions_from_python(original_file)
+    original_code = _LLM_CONFIG_SRC
+    # Step 1: Parse original code
+    definitions = get_definitions_from_python(code_string=original_code)
     task_defs = definitions["tasks"]
     worker_defs = definitions["workers"]
 
-    print("\nParsed Worker definitions:")
-    for worker in worker_defs:
-        print(f"  {worker['className']} ({worker['workerType']})")
-        if "llmConfigFromCode" in worker:
-            print(f"    LLM Config: {worker['llmConfigFromCode']}")
-
     # Verify that we parsed the LLM configurations
     assert len(worker_defs) == 2, f"Expected 2 worker classes, got {len(worker_defs)}"
     openai_worker = next(
@@ -1074,26 +1005,18 @@ def build_graph():
     assert anthropic_worker["llmConfigFromCode"]["max_tokens"]["is_literal"] is True
 
     # Step 2: Create graph data for regeneration
-    task_nodes = []
-    for i, task_def in enumerate(task_defs):
-        task_nodes.append({"id": f"task_{i}", "type": "task", "data": task_def})
+    task_nodes = [
+        {"id": f"task_{i}", "type": "task", "data": task_def}
+        for i, task_def in enumerate(task_defs)
+    ]
 
     worker_nodes = []
     for i, worker_def in enumerate(worker_defs):
         # Simulate the frontend creating the llmConfig based on llmConfigFromCode
         if "llmConfigFromCode" in worker_def:
-            original_llm_config = worker_def["llmConfigFromCode"]
-            # Create the new llmConfig structure for the regeneration step
-            new_llm_config = {}
-            for key, config_item in original_llm_config.items():
-                # Ensure config_item is the dictionary { "value": ..., "is_literal": ... }
-                new_llm_config[key] = (
-                    config_item  # Already in correct format (shouldn't happen yet)
-                )
-
-            # Replace llmConfigFromCode with the new llmConfig for regeneration
-            worker_def["llmConfig"] = new_llm_config
-            del worker_def["llmConfigFromCode"]
+            # Items are already { "value": ..., "is_literal": ... } dictionaries,
+            # so llmConfigFromCode becomes llmConfig unchanged for regeneration
+            worker_def["llmConfig"] = worker_def.pop("llmConfigFromCode")
 
         worker_nodes.append(
             {
@@ -1111,92 +1034,20 @@ def build_graph():
     assert python_code is not None, "No Python code generated"
 
     # Print the generated code for debugging
-    print("\nRegenerated Python code:")
-    print(python_code)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("\nRegenerated Python code:")
+        logger.debug(python_code)
 
-    # Step 4: Write and parse regenerated code
-    regen_file = temp_file(python_code)
-    regen_definitions = get_definitions_from_python(regen_file)
+    # Step 4: Parse regenerated code
+    regen_definitions = get_definitions_from_python(code_string=python_code)
     regen_worker_defs = regen_definitions["workers"]
-
-    print("\nRegenerated Worker definitions:")
-    for worker in regen_worker_defs:
-        print(f"  {worker['className']} ({worker['workerType']})")
+    assert {w["className"] for w in regen_worker_defs} == {
+        "OpenAIProcessor",
+        "AnthropicProcessor",
+    }, f"Regenerated workers: {[w['className'] for w in regen_worker_defs]}"
 
     # Step 5: Verify that the regenerated code contains the LLM instantiations
+    found_llm_snippets = set(_LLM_SNIPPET_RE.findall(python_code))
     assert (
-        "llm_from_config(" in python_code
-    ), "llm_from_config call missing in generated code"
-    assert (
-        'provider="openai"' in python_code
-    ), "OpenAI provider missing in generated code"
-    assert (
-        'provider="anthropic"' in python_code
-    ), "Anthropic provider missing in generated code"
-    assert (
-        'model_name="gpt-4"' in python_code
-    ), "GPT-4 model name missing in generated code"
-    assert (
-        'model_name="claude-3-opus-20240229"' in python_code
-    ), "Claude model name missing in generated code"
-    assert (
-        "max_tokens=1024" in python_code
-    ), "OpenAI max_tokens missing in generated code"
-    assert (
-        "max_tokens=2048" in python_code
-    ), "Anthropic max_tokens missing in generated code"
-
-
-def test_deepsearch_fixture_roundtrip(temp_file):
-    """Test roundtrip conversion of the deepsearch fixture."""
-    # Parse the original file
-    # Define the path to the original releasenotes example
-    original_file_path = (
-        Path(__file__).parent.parent
-        / "tests"
-        / "e2e"
-        / "fixtures"
-        / "deepsearch_fixture.py"
-    )
-    orig_definitions = parse_python_file(original_file_path)
-
-    # Extract original components
-    orig_task_defs = orig_definitions.get("tasks", [])
-    orig_worker_defs = orig_definitions.get("workers", [])
-    orig_edges = orig_definitions.get("edges", [])
-    orig_imported_tasks = orig_definitions.get("imported_tasks", [])
-
-    # Create graph data structure
-    graph_data = create_graph_data(
-        orig_task_defs, orig_worker_defs, orig_imported_tasks, orig_edges
-    )
-
-    # Generate Python code and parse the regenerated definitions
-    _, regen_definitions = generate_and_parse(
-        graph_data, temp_file, print_generated_code=False  # Set to True for debugging
-    )
-
-    # Extract regenerated components
-    regen_task_defs = regen_definitions.get("tasks", [])
-    regen_worker_defs = regen_definitions.get("workers", [])
-    regen_edges = regen_definitions.get("edges", [])
-    regen_imported_tasks = regen_definitions.get("imported_tasks", [])
-
-    # Compare components
-    compare_tasks(orig_task_defs, regen_task_defs)
-    compare_workers(orig_worker_defs, regen_worker_defs)
-    compare_edges(orig_edges, regen_edges)
-    compare_imported_tasks(orig_imported_tasks, regen_imported_tasks)
-
-    # Print a summary of the test
-    print("\nDeepsearch fixture roundtrip summary:")
-    print(
-        f"Original tasks: {len(orig_task_defs)}, Regenerated tasks: {len(regen_task_defs)}"
-    )
-    print(
-        f"Original workers: {len(orig_worker_defs)}, Regenerated workers: {len(regen_worker_defs)}"
-    )
-    print(f"Original edges: {len(orig_edges)}, Regenerated edges: {len(regen_edges)}")
-    print(
-        f"Original imported tasks: {len(orig_imported_tasks)}, Regenerated imported tasks: {len(regen_imported_tasks)}"
-    )
+        found_llm_snippets == _LLM_SNIPPETS
+    ), f"LLM config snippets missing in generated code: {_LLM_SNIPPETS - found_llm_snippets}"
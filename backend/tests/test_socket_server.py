@@ -1,6 +1,7 @@
 import threading
 import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict
 from unittest.mock import patch
 
@@ -8,23 +9,46 @@ from unittest.mock import patch
 from planaieditor.socket_server import SocketClient, SocketServer, send_debug_event
 
 
-class TestSocketServer(unittest.TestCase):
-    """Test cases for the SocketServer class."""
+# Upper bound for waiting on server callbacks; tests return as soon as they arrive
+MESSAGE_TIMEOUT = 5.0
+
+
+class MessageCollectorMixin:
+    """Collects messages from the server callback and lets tests wait for them."""
 
     def setUp(self):
         """Set up test fixtures."""
         # Create a list to store received messages
         self.received_messages = []
+        self.messages_changed = threading.Condition()
 
         # Define a callback function for the server
         def message_callback(message: Dict[str, Any]):
-            self.received_messages.append(message)
+            with self.messages_changed:
+                self.received_messages.append(message)
+                self.messages_changed.notify_all()
 
         self.callback = message_callback
 
-    def tearDown(self):
-        """Clean up after tests."""
-        self.received_messages.clear()
+    def wait_for_messages(self, count: int) -> bool:
+        """Block until at least count messages arrived or MESSAGE_TIMEOUT passed."""
+        with self.messages_changed:
+            return self.messages_changed.wait_for(
+                lambda: len(self.received_messages) >= count, MESSAGE_TIMEOUT
+            )
+
+    def start_server(self) -> SocketServer:
+        """Start a server delivering to this test only; stopped on cleanup."""
+        # A server per test keeps late messages from one test out of the
+        # exact message counts of the next
+        server = SocketServer(callback=self.callback)
+        server.start()
+        self.addCleanup(server.stop)
+        return server
+
+
+class TestSocketServer(MessageCollectorMixin, unittest.TestCase):
+    """Test cases for the SocketServer class."""
 
     def test_server_init(self):
         """Test that the server initializes correctly."""
@@ -96,85 +120,82 @@ class TestSocketServer(unittest.TestCase):
 
     def test_client_context_manager(self):
         """Test that client works as a context manager when server is running."""
-        with SocketServer(callback=self.callback) as server:
-            # Mock the connect and disconnect methods
-            with patch.object(SocketClient, "connect") as mock_connect, patch.object(
-                SocketClient, "disconnect"
-            ) as mock_disconnect:
+        # Mock the connect and disconnect methods
+        with patch.object(SocketClient, "connect") as mock_connect, patch.object(
+            SocketClient, "disconnect"
+        ) as mock_disconnect:
 
-                with SocketClient(port=server.port):
-                    mock_connect.assert_called_once()
+            with SocketClient(port=self.start_server().port):
+                mock_connect.assert_called_once()
 
-                mock_disconnect.assert_called_once()
+            mock_disconnect.assert_called_once()
 
     def test_server_client_integration(self):
         """Test that the server and client can communicate properly."""
-        # Start the server with our callback
-        with SocketServer(callback=self.callback) as server:
-            # Connect a client
-            client = SocketClient(port=server.port)
-            client.connect()
+        # Connect a client
+        client = SocketClient(port=self.start_server().port)
+        client.connect()
 
-            # Send a test message
-            test_message = {"type": "test", "data": {"value": 123}}
-            success = client.send(test_message)
-            self.assertTrue(success)
+        # Send a test message
+        test_message = {"type": "test", "data": {"value": 123}}
+        success = client.send(test_message)
+        self.assertTrue(success)
 
-            # Give the server time to process the message
-            time.sleep(0.1)
+        # Wait for the server to process the message
+        self.wait_for_messages(1)
 
-            # Check that the message was received
-            self.assertEqual(len(self.received_messages), 1)
-            self.assertEqual(self.received_messages[0], test_message)
+        # Check that the message was received
+        self.assertEqual(len(self.received_messages), 1)
+        self.assertEqual(self.received_messages[0], test_message)
 
-            # Clean up
-            client.disconnect()
+        # Clean up
+        client.disconnect()
 
     def test_send_debug_event_function(self):
         """Test the send_debug_event convenience function."""
-        with SocketServer(callback=self.callback) as server:
-            port = server.port
+        port = self.start_server().port
 
-            # Test with explicit port
-            success = send_debug_event("test_event", {"key": "value"}, port=port)
-            self.assertTrue(success)
+        # Test with explicit port
+        success = send_debug_event("test_event", {"key": "value"}, port=port)
+        self.assertTrue(success)
 
-            # Test with environment variable
-            with patch.dict("os.environ", {"DEBUG_PORT": str(port)}):
-                success = send_debug_event("env_event", {"env": True})
-                self.assertTrue(success)
+        # Test with environment variable
+        with patch.dict("os.environ", {"DEBUG_PORT": str(port)}):
+            success = send_debug_event("env_event", {"env": True})
+            self.assertTrue(success)
 
-            # Give server time to process
-            time.sleep(0.1)
+        # Wait for the server to process both messages
+        self.wait_for_messages(2)
 
-            # Check both messages were received
-            self.assertEqual(len(self.received_messages), 2)
-            self.assertEqual(self.received_messages[0]["type"], "test_event")
-            self.assertEqual(self.received_messages[1]["type"], "env_event")
+        # Check both messages were received
+        self.assertEqual(len(self.received_messages), 2)
+        self.assertEqual(self.received_messages[0]["type"], "test_event")
+        self.assertEqual(self.received_messages[1]["type"], "env_event")
 
     def test_multiple_clients(self):
         """Test that the server can handle multiple clients."""
-        with SocketServer(callback=self.callback) as server:
-            # Create and connect multiple clients
-            clients = []
-            for i in range(3):
-                client = SocketClient(port=server.port)
-                client.connect()
-                clients.append(client)
+        server = self.start_server()
 
-            # Each client sends a message
-            for i, client in enumerate(clients):
-                client.send({"client_id": i, "message": f"Hello from client {i}"})
+        # Create and connect multiple clients
+        clients = []
+        for i in range(3):
+            client = SocketClient(port=server.port)
+            client.connect()
+            clients.append(client)
 
-            # Give server time to process
-            time.sleep(0.2)
+        # Each client sends a message
+        for i, client in enumerate(clients):
+            client.send({"client_id": i, "message": f"Hello from client {i}"})
 
-            # Verify all messages were received
-            self.assertEqual(len(self.received_messages), 3)
+        # Wait for the server to process all messages
+        self.wait_for_messages(3)
 
-            # Clean up
-            for client in clients:
-                client.disconnect()
+        # Verify all messages were received
+        self.assertEqual(len(self.received_messages), 3)
+
+        # Clean up
+        for client in clients:
+            client.disconnect()
 
     def test_server_stops_gracefully(self):
         """Test that the server stops gracefully even with active clients."""
@@ -192,67 +213,51 @@ class TestSocketServer(unittest.TestCase):
         self.assertFalse(server._running)
         self.assertIsNone(server._server_socket)
 
-        attempts = 0
-        while attempts < 10:
-            # There seems to be a timing problem when running on GitHub Actions.
-            # This is a hack to make sure the server is fully stopped.
-            time.sleep(1)
-            attempts += 1
+        # The first sends after the close may still be buffered by the OS, so
+        # keep retrying until the broken connection surfaces
+        deadline = time.monotonic() + MESSAGE_TIMEOUT
+        while True:
             # Client should not be able to send after server stops
             result = client.send({"test": "message"})
-            if not result:
+            if not result or time.monotonic() >= deadline:
                 break
+            time.sleep(0.05)
 
         self.assertFalse(result, "Client should not be able to send after server stops")
 
 
-class TestServerStress(unittest.TestCase):
+class TestServerStress(MessageCollectorMixin, unittest.TestCase):
     """Additional stress tests for the socket server."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        self.received_messages = []
-        self.message_count_lock = threading.Lock()
-
-        def message_callback(message: Dict[str, Any]):
-            with self.message_count_lock:
-                self.received_messages.append(message)
-
-        self.callback = message_callback
-
-    def tearDown(self):
-        """Clean up after tests."""
-        self.received_messages.clear()
-
     def test_rapid_messages(self):
         """Test sending many messages in rapid succession."""
         NUM_MESSAGES = 50
 
-        with SocketServer(callback=self.callback) as server:
-            client = SocketClient(port=server.port)
-            client.connect()
+        client = SocketClient(port=self.start_server().port)
+        client.connect()
 
-            # Send many messages in quick succession
-            for i in range(NUM_MESSAGES):
-                client.send({"index": i, "data": f"Message {i}"})
+        # Send many messages in quick succession
+        for i in range(NUM_MESSAGES):
+            client.send({"index": i, "data": f"Message {i}"})
 
-            # Give time for processing
-            time.sleep(0.5)
+        # Wait for processing
+        self.wait_for_messages(NUM_MESSAGES)
 
-            # Verify all messages were received (in any order)
-            with self.message_count_lock:
-                self.assertEqual(len(self.received_messages), NUM_MESSAGES)
+        # Verify all messages were received (in any order)
+        with self.messages_changed:
+            self.assertEqual(len(self.received_messages), NUM_MESSAGES)
 
-                # Check that all indices are present
-                indices = {msg["index"] for msg in self.received_messages}
-                self.assertEqual(len(indices), NUM_MESSAGES)
+            # Check that all indices are present
+            indices = {msg["index"] for msg in self.received_messages}
+            self.assertEqual(len(indices), NUM_MESSAGES)
 
-            client.disconnect()
+        client.disconnect()
 
     def test_concurrent_clients(self):
         """Test concurrent client connections and message sending."""
         NUM_CLIENTS = 5
         MSGS_PER_CLIENT = 10
+        server = self.start_server()
 
         def client_worker(client_id):
             with SocketClient(port=server.port) as client:
@@ -267,33 +272,26 @@ class TestServerStress(unittest.TestCase):
                     # Small random delay to simulate real-world usage
                     time.sleep(0.01)
 
-        with SocketServer(callback=self.callback) as server:
-            # Start client threads
-            threads = []
-            for i in range(NUM_CLIENTS):
-                thread = threading.Thread(target=client_worker, args=(i,))
-                thread.start()
-                threads.append(thread)
-
-            # Wait for all clients to finish
-            for thread in threads:
-                thread.join()
-
-            # Give server time to process any remaining messages
-            time.sleep(0.2)
-
-            # Verify all messages were received
-            self.assertEqual(len(self.received_messages), NUM_CLIENTS * MSGS_PER_CLIENT)
-
-            # Check distribution of messages from clients
-            client_counts = {}
-            for msg in self.received_messages:
-                client_id = msg["client_id"]
-                client_counts[client_id] = client_counts.get(client_id, 0) + 1
-
-            # Each client should have sent exactly MSGS_PER_CLIENT messages
-            for i in range(NUM_CLIENTS):
-                self.assertEqual(client_counts.get(i, 0), MSGS_PER_CLIENT)
+        # Run the clients concurrently and wait for all of them to finish;
+        # consuming the results re-raises any exception from a client
+        with ThreadPoolExecutor(max_workers=NUM_CLIENTS) as executor:
+            list(executor.map(client_worker, range(NUM_CLIENTS)))
+
+        # Wait for the server to process any remaining messages
+        self.wait_for_messages(NUM_CLIENTS * MSGS_PER_CLIENT)
+
+        # Verify all messages were received
+        self.assertEqual(len(self.received_messages), NUM_CLIENTS * MSGS_PER_CLIENT)
+
+        # Check distribution of messages from clients
+        client_counts = {}
+        for msg in self.received_messages:
+            client_id = msg["client_id"]
+            client_counts[client_id] = client_counts.get(client_id, 0) + 1
+
+        # Each client should have sent exactly MSGS_PER_CLIENT messages
+        for i in range(NUM_CLIENTS):
+            self.assertEqual(client_counts.get(i, 0), MSGS_PER_CLIENT)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 import logging
 import os
+import tempfile
 import unittest
 from pathlib import Path
 
@@ -12,11 +13,21 @@ logging.getLogger("TempFileManager").setLevel(logging.CRITICAL + 1)
 
 
 class TestTempFileManager(unittest.TestCase):
-    def setUp(self):
-        self.manager = TempFileManager()
+    @classmethod
+    def setUpClass(cls):
+        cls.manager = TempFileManager()
 
     def tearDown(self):
+        # The manager is shared by the class; leave it empty for the next test
         self.manager.cleanup_all_temp_files()
+        self.manager.inmemory_documents.clear()
+
+    def assertTempFileContent(self, temp_path_str, expected, msg=None):
+        self.assertEqual(Path(temp_path_str).read_text(encoding="utf-8"), expected, msg)
+
+    def expected_file_uri(self, original_uri):
+        """The file URI of the temp file on disk, derived independently."""
+        return Path(self.manager._get_temp_file_path(original_uri)).resolve().as_uri()
 
     def test_create_new_temp_file(self):
         uri = "inmemory://model/1"
@@ -32,11 +43,11 @@ class TestTempFileManager(unittest.TestCase):
             os.path.exists(temp_path_str), f"Temp file {temp_path_str} should exist."
         )
 
-        with open(temp_path_str, "r", encoding="utf-8") as f:
-            self.assertEqual(f.read(), content)
+        self.assertTempFileContent(temp_path_str, content)
 
-        normalized_temp_path = str(Path(temp_path_str).resolve())
-        self.assertEqual(self.manager._get_original_uri(normalized_temp_path), uri)
+        self.assertEqual(self.manager._get_original_uri(temp_path_str), uri)
+        self.assertEqual(file_uri_str, self.expected_file_uri(uri))
+        self.assertEqual(self.manager.canonical_file_uri(uri), file_uri_str)
 
     def test_update_existing_temp_file(self):
         uri = "inmemory://model/update_test"
@@ -54,8 +65,7 @@ class TestTempFileManager(unittest.TestCase):
         )  # Should return the same file URI
 
         self.assertTrue(os.path.exists(temp_path_str))
-        with open(temp_path_str, "r", encoding="utf-8") as f:
-            self.assertEqual(f.read(), updated_content)
+        self.assertTempFileContent(temp_path_str, updated_content)
 
     def test_create_temp_file_for_non_inmemory_uri(self):
         uri = "file:///some/local/file.py"
@@ -65,6 +75,16 @@ class TestTempFileManager(unittest.TestCase):
         self.assertIsNone(returned_path)
         self.assertIsNone(self.manager._get_temp_file_path(uri))
 
+    def test_temp_files_created_in_configured_dir(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = TempFileManager(temp_dir=temp_dir)
+            try:
+                manager.create_or_update_temp_file("inmemory://model/dir", "x = 1")
+                temp_path_str = manager._get_temp_file_path("inmemory://model/dir")
+                self.assertEqual(Path(temp_path_str).parent, Path(temp_dir).resolve())
+            finally:
+                manager.cleanup_all_temp_files()
+
     def test_delete_temp_file(self):
         uri = "inmemory://model/to_delete"
         content = "delete me"
@@ -124,15 +144,11 @@ class TestTempFileManager(unittest.TestCase):
 
         self.assertIsNotNone(temp_physical_path)
         self.assertTrue(os.path.exists(temp_physical_path))
-        with open(temp_physical_path, "r", encoding="utf-8") as f:
-            self.assertEqual(f.read(), content)
+        self.assertTempFileContent(temp_physical_path, content)
 
         translated_uri_in_msg = translated_message["params"]["textDocument"]["uri"]
         self.assertTrue(translated_uri_in_msg.startswith("file:///"))
-        self.assertEqual(
-            Path(translated_uri_in_msg.replace("file://", "")).resolve(),
-            Path(temp_physical_path).resolve(),
-        )
+        self.assertEqual(translated_uri_in_msg, self.expected_file_uri(original_uri))
 
     def test_translate_did_change_to_server(self):
         original_uri = "inmemory://model/change_doc.py"
@@ -158,10 +174,11 @@ class TestTempFileManager(unittest.TestCase):
         self.assertTrue(
             os.path.exists(temp_physical_path), "Temp file should exist after didOpen"
         )
-        with open(temp_physical_path, "r", encoding="utf-8") as f:
-            self.assertEqual(
-                f.read(), initial_content, "Content should be initial after didOpen"
-            )
+        self.assertTempFileContent(
+            temp_physical_path,
+            initial_content,
+            "Content should be initial after didOpen",
+        )
 
         new_content = "updated content"
         change_message = {
@@ -175,15 +192,11 @@ class TestTempFileManager(unittest.TestCase):
         translated_message = self.manager.translate_message_to_server(change_message)
 
         self.assertTrue(os.path.exists(temp_physical_path))
-        with open(temp_physical_path, "r", encoding="utf-8") as f:
-            self.assertEqual(f.read(), new_content)
+        self.assertTempFileContent(temp_physical_path, new_content)
 
         translated_uri_in_msg = translated_message["params"]["textDocument"]["uri"]
         self.assertTrue(translated_uri_in_msg.startswith("file:///"))
-        self.assertEqual(
-            Path(translated_uri_in_msg.replace("file://", "")).resolve(),
-            Path(temp_physical_path).resolve(),
-        )
+        self.assertEqual(translated_uri_in_msg, self.expected_file_uri(original_uri))
         self.assertEqual(
             translated_message["params"]["contentChanges"][0]["text"], new_content
         )
@@ -191,10 +204,10 @@ class TestTempFileManager(unittest.TestCase):
     def test_translate_did_close_to_server(self):
         original_uri = "inmemory://model/close_me.py"
         content = "content_to_be_deleted"
-        expected_file_uri_str = self.manager.create_or_update_temp_file(
-            original_uri, content
+        self.assertIsNotNone(
+            self.manager.create_or_update_temp_file(original_uri, content)
         )
-        self.assertIsNotNone(expected_file_uri_str)
+        expected_file_uri_str = self.expected_file_uri(original_uri)
 
         temp_physical_path_before_close = self.manager._get_temp_file_path(original_uri)
         self.assertTrue(os.path.exists(temp_physical_path_before_close))
@@ -220,9 +233,7 @@ class TestTempFileManager(unittest.TestCase):
         )
         self.assertIsNone(self.manager._get_temp_file_path(original_uri))
         self.assertIsNone(
-            self.manager._get_original_uri(
-                str(Path(expected_file_uri_str.replace("file://", "")).resolve())
-            )
+            self.manager._get_original_uri(temp_physical_path_before_close)
         )
 
     def test_translate_publish_diagnostics_to_client(self):
@@ -251,7 +262,6 @@ class TestTempFileManager(unittest.TestCase):
         content = "some python code"
         # Ensure the URI is known so it *can* be translated
         self.manager.create_or_update_temp_file(original_nested_uri, content)
-        temp_physical_path = self.manager._get_temp_file_path(original_nested_uri)
 
         message = {
             "method": "someLspMethod",
@@ -265,8 +275,7 @@ class TestTempFileManager(unittest.TestCase):
         translated_nested_uri = translated_message["params"]["outerKey"]["uri"]
         self.assertTrue(translated_nested_uri.startswith("file:///"))
         self.assertEqual(
-            Path(translated_nested_uri.replace("file://", "")).resolve(),
-            Path(temp_physical_path).resolve(),
+            translated_nested_uri, self.expected_file_uri(original_nested_uri)
         )
 
     def test_translate_nested_uri_to_client(self):
@@ -379,8 +388,7 @@ class TestTempFileManager(unittest.TestCase):
         self.manager.translate_message_to_server(open_message)
         temp_physical_path = self.manager._get_temp_file_path(original_uri)
         self.assertIsNotNone(temp_physical_path)
-        with open(temp_physical_path, "r", encoding="utf-8") as f:
-            self.assertEqual(f.read(), initial_content)
+        self.assertTempFileContent(temp_physical_path, initial_content)
 
         # 2. Define and apply an incremental change (e.g., replace 'two' with 'TWO_MODIFIED')
         change_event = {
@@ -404,8 +412,7 @@ class TestTempFileManager(unittest.TestCase):
         # 3. Verify the content of the temp file
         expected_content_after_change = "line one\nline TWO_MODIFIED\nline three"
         self.assertTrue(os.path.exists(temp_physical_path))
-        with open(temp_physical_path, "r", encoding="utf-8") as f:
-            self.assertEqual(f.read(), expected_content_after_change)
+        self.assertTempFileContent(temp_physical_path, expected_content_after_change)
 
 
 if __name__ == "__main__":
@@ -51,6 +51,22 @@ def test_split_multi_line_signature():
     assert body_lines[2] == "return arg2 > 10"
 
 
+def test_split_signature_with_brackets_in_defaults():
+    """Colons and parentheses inside strings or brackets don't end the signature."""
+    method_source = """def tricky(self, sep: str = "):", pairs: Dict[str, int] = {"a": 1}) -> Optional[
+    str
+]:
+    return sep
+"""
+    signature, body_lines = split_method_signature_body(method_source)
+
+    assert signature == (
+        'def tricky(self, sep: str = "):", pairs: Dict[str, int] = {"a": 1})'
+        " -> Optional[\n    str\n]:"
+    )
+    assert body_lines == ["return sep"]
+
+
 def test_split_pass_only_method():
     """Test splitting a method with just 'pass'."""
     method_source = """def empty_method(self):